@@ -1,22 +1,91 @@
 """
 Analytics business logic and calculations
 """
+import statistics
+from concurrent.futures import ThreadPoolExecutor
 from decimal import Decimal
-from django.db.models import Sum, Count, Avg, Q, F
-from django.db.models.functions import TruncMonth, TruncYear
-from datetime import datetime, timedelta
+from functools import wraps
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Sum, Count, Avg, Q, F, Case, When, Value, CharField
+from django.db.models.functions import TruncMonth, TruncYear, ExtractMonth, ExtractYear
+from datetime import datetime
+from dateutil.relativedelta import relativedelta
 from apps.procurement.models import Transaction, Supplier, Category
 
+# How long cached analytics results are kept (seconds). Slightly longer
+# than the hourly refresh_analytics_cache beat schedule so precomputed
+# entries stay warm between refreshes; correctness is preserved by the
+# version-based invalidation, not the TTL.
+ANALYTICS_CACHE_TTL = 3900
+
+
+def get_analytics_cache_version(organization_id):
+    """
+    Get the current analytics cache version for an organization.
+
+    The version is bumped whenever transaction data changes, which
+    invalidates all cached analytics results for that organization
+    without having to enumerate and delete individual keys.
+    """
+    key = f'analytics:version:{organization_id}'
+    version = cache.get(key)
+    if version is None:
+        # cache.add is atomic, so concurrent requests agree on the
+        # initial version (stampede-safe)
+        cache.add(key, 1, None)
+        version = cache.get(key, 1)
+    return version
+
+
+def bump_analytics_cache_version(organization_id):
+    """Invalidate cached analytics for an organization by bumping its version."""
+    key = f'analytics:version:{organization_id}'
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Key expired or was never set - any new version invalidates old entries
+        cache.add(key, 2, None)
+
+
+def org_cached(method):
+    """
+    Cache an AnalyticsService method result per organization.
+
+    The cache key includes the organization id, the org-level cache version
+    and any method arguments, so repeated dashboard loads are served from
+    cache instead of re-running aggregate queries.
+    """
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        version = get_analytics_cache_version(self.organization.id)
+        suffix = ''
+        if args or kwargs:
+            params = ':'.join(
+                [str(a) for a in args] +
+                [f'{k}={v}' for k, v in sorted(kwargs.items())]
+            )
+            suffix = f':{params}'
+        key = f'analytics:{method.__name__}:{self.organization.id}:v{version}{suffix}'
+        return cache.get_or_set(
+            key,
+            lambda: method(self, *args, **kwargs),
+            ANALYTICS_CACHE_TTL
+        )
+    return wrapper
+
 
 class AnalyticsService:
     """
     Service class for analytics calculations
     """
-    
+
     def __init__(self, organization):
         self.organization = organization
         self.transactions = Transaction.objects.filter(organization=organization)
-    
+
+    @org_cached
     def get_overview_stats(self):
         """
         Get overview statistics
@@ -37,6 +106,7 @@ class AnalyticsService:
             'avg_transaction': float(stats['avg_transaction'] or 0)
         }
     
+    @org_cached
     def get_spend_by_category(self):
         """
         Get spend breakdown by category
@@ -57,6 +127,7 @@ class AnalyticsService:
             for item in data
         ]
     
+    @org_cached
     def get_spend_by_supplier(self):
         """
         Get spend breakdown by supplier
@@ -77,11 +148,14 @@ class AnalyticsService:
             for item in data
         ]
     
+    @org_cached
     def get_monthly_trend(self, months=12):
         """
         Get monthly spend trend
         """
-        cutoff_date = datetime.now().date() - timedelta(days=months*30)
+        # Exact calendar months; the old months*30 approximation drifted
+        # by several days over a year
+        cutoff_date = datetime.now().date() - relativedelta(months=months)
         
         data = self.transactions.filter(
             date__gte=cutoff_date
@@ -101,52 +175,72 @@ class AnalyticsService:
             for item in data
         ]
     
+    @org_cached
     def get_pareto_analysis(self):
         """
         Get Pareto analysis (80/20 rule) for suppliers
         """
-        suppliers = self.transactions.values(
-            'supplier__name'
-        ).annotate(
-            total=Sum('amount')
-        ).order_by('-total')
-        
-        total_spend = sum(s['total'] for s in suppliers)
-        cumulative = 0
-        result = []
-        
-        for supplier in suppliers:
-            cumulative += supplier['total']
-            percentage = (cumulative / total_spend * 100) if total_spend > 0 else 0
-            
-            result.append({
-                'supplier': supplier['supplier__name'],
-                'amount': float(supplier['total']),
-                'cumulative_percentage': round(percentage, 2)
-            })
-        
-        return result
+        # Cumulative and grand totals are computed in SQL via window
+        # functions instead of accumulating in Python. Raw SQL is needed
+        # here because the ORM cannot window over a GROUP BY aggregate;
+        # the syntax is standard and runs on both PostgreSQL and SQLite.
+        sql = """
+            SELECT
+                s.name,
+                SUM(t.amount) AS total,
+                SUM(SUM(t.amount)) OVER (
+                    ORDER BY SUM(t.amount) DESC, s.name
+                ) AS cumulative,
+                SUM(SUM(t.amount)) OVER () AS grand_total
+            FROM procurement_transaction t
+            JOIN procurement_supplier s ON s.id = t.supplier_id
+            WHERE t.organization_id = %s
+            GROUP BY s.name
+            ORDER BY total DESC, s.name
+        """
+
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [self.organization.id])
+            rows = cursor.fetchall()
+
+        return [
+            {
+                'supplier': name,
+                'amount': float(total),
+                'cumulative_percentage': round(
+                    float(cumulative) / float(grand_total) * 100
+                    if grand_total else 0,
+                    2
+                )
+            }
+            for name, total, cumulative, grand_total in rows
+        ]
     
+    @org_cached
     def get_tail_spend_analysis(self, threshold_percentage=20):
         """
         Analyze tail spend (bottom X% of suppliers)
         """
-        suppliers = list(self.transactions.values(
+        total_spend = self.transactions.aggregate(
+            total=Sum('amount')
+        )['total'] or Decimal('0')
+        threshold_amount = total_spend * Decimal(str(threshold_percentage)) / Decimal('100')
+
+        suppliers = self.transactions.values(
             'supplier__name',
             'supplier_id'
         ).annotate(
             total=Sum('amount'),
             count=Count('id')
-        ).order_by('-total'))
-        
-        total_spend = sum(s['total'] for s in suppliers) or Decimal('0')
-        threshold_amount = total_spend * Decimal(str(threshold_percentage)) / Decimal('100')
-        
-        cumulative = 0
+        ).order_by('total')
+
+        cumulative = Decimal('0')
         tail_suppliers = []
-        
-        # Find tail suppliers (from bottom)
-        for supplier in reversed(suppliers):
+
+        # Walk suppliers from the smallest spend upward, streaming rows in
+        # chunks instead of materializing the full ranking, and stop as
+        # soon as the threshold is reached
+        for supplier in suppliers.iterator(chunk_size=500):
             if cumulative >= threshold_amount:
                 break
             cumulative += supplier['total']
@@ -164,6 +258,7 @@ class AnalyticsService:
             'tail_percentage': round((cumulative / total_spend * 100) if total_spend > 0 else 0, 2)
         }
     
+    @org_cached
     def get_spend_stratification(self):
         """
         Categorize spend into strategic, leverage, bottleneck, and tactical
@@ -177,60 +272,69 @@ class AnalyticsService:
             supplier_count=Count('supplier', distinct=True),
             transaction_count=Count('id')
         )
-        
-        # Calculate medians for classification
-        spends = [c['total_spend'] for c in categories]
-        supplier_counts = [c['supplier_count'] for c in categories]
-        
-        median_spend = sorted(spends)[len(spends)//2] if spends else 0
-        median_suppliers = sorted(supplier_counts)[len(supplier_counts)//2] if supplier_counts else 0
-        
+
         result = {
             'strategic': [],  # High spend, few suppliers
             'leverage': [],   # High spend, many suppliers
             'bottleneck': [], # Low spend, few suppliers
             'tactical': []    # Low spend, many suppliers
         }
-        
-        for cat in categories:
-            item = {
+
+        # Calculate medians for classification. statistics.median
+        # interpolates for even-sized samples; indexing the sorted list at
+        # len//2 picked the upper element, skewing the thresholds.
+        stats = list(categories.values_list('total_spend', 'supplier_count'))
+        if not stats:
+            return result
+
+        median_spend = statistics.median(s for s, _ in stats)
+        median_suppliers = statistics.median(c for _, c in stats)
+
+        # Classify in the database: a CASE expression over the aggregates
+        # returns each category with its bucket already assigned, so Python
+        # only has to distribute rows into the result dict.
+        bucketed = categories.annotate(
+            bucket=Case(
+                When(
+                    total_spend__gte=median_spend,
+                    supplier_count__lte=median_suppliers,
+                    then=Value('strategic')
+                ),
+                When(total_spend__gte=median_spend, then=Value('leverage')),
+                When(supplier_count__lte=median_suppliers, then=Value('bottleneck')),
+                default=Value('tactical'),
+                output_field=CharField()
+            )
+        )
+
+        for cat in bucketed:
+            result[cat['bucket']].append({
                 'category': cat['category__name'],
                 'spend': float(cat['total_spend']),
                 'supplier_count': cat['supplier_count'],
                 'transaction_count': cat['transaction_count']
-            }
-            
-            if cat['total_spend'] >= median_spend:
-                if cat['supplier_count'] <= median_suppliers:
-                    result['strategic'].append(item)
-                else:
-                    result['leverage'].append(item)
-            else:
-                if cat['supplier_count'] <= median_suppliers:
-                    result['bottleneck'].append(item)
-                else:
-                    result['tactical'].append(item)
-        
+            })
+
         return result
     
+    @org_cached
     def get_seasonality_analysis(self):
         """
         Analyze spending patterns by month across years
         """
+        # Group by (year, month number) directly in the database via
+        # EXTRACT instead of truncating to dates and re-parsing in Python
         data = self.transactions.annotate(
-            month=TruncMonth('date')
-        ).values('month').annotate(
-            total=Sum('amount'),
-            count=Count('id')
-        ).order_by('month')
-        
-        # Group by month number
+            year=ExtractYear('date'),
+            month_num=ExtractMonth('date')
+        ).values('year', 'month_num').annotate(
+            total=Sum('amount')
+        ).order_by('year', 'month_num')
+
+        # Collect per-year totals for each month number
         monthly_avg = {}
         for item in data:
-            month_num = item['month'].month
-            if month_num not in monthly_avg:
-                monthly_avg[month_num] = []
-            monthly_avg[month_num].append(float(item['total']))
+            monthly_avg.setdefault(item['month_num'], []).append(float(item['total']))
         
         # Calculate averages
         result = []
@@ -247,6 +351,7 @@ class AnalyticsService:
         
         return result
     
+    @org_cached
     def get_year_over_year_comparison(self):
         """
         Compare spending year over year
@@ -278,40 +383,96 @@ class AnalyticsService:
         
         return result
     
+    @org_cached
     def get_supplier_consolidation_opportunities(self):
         """
         Identify opportunities for supplier consolidation
         """
-        # Find categories with multiple suppliers
-        categories_with_multiple = self.transactions.values(
+        # Single GROUP BY over (category, supplier); the per-category
+        # supplier breakdown is assembled in Python instead of issuing an
+        # extra query for each flagged category
+        rows = self.transactions.values(
+            'category_id',
             'category__name',
-            'category_id'
+            'supplier__name'
         ).annotate(
-            supplier_count=Count('supplier', distinct=True),
-            total_spend=Sum('amount')
-        ).filter(supplier_count__gt=2).order_by('-supplier_count')
-        
+            spend=Sum('amount')
+        ).order_by('category_id', '-spend')
+
+        by_category = {}
+        for row in rows.iterator(chunk_size=1000):
+            entry = by_category.setdefault(row['category_id'], {
+                'category': row['category__name'],
+                'total_spend': Decimal('0'),
+                'suppliers': []
+            })
+            entry['total_spend'] += row['spend']
+            entry['suppliers'].append({
+                'name': row['supplier__name'],
+                'spend': float(row['spend'])
+            })
+
         opportunities = []
-        for cat in categories_with_multiple:
-            # Get suppliers in this category
-            suppliers = self.transactions.filter(
-                category_id=cat['category_id']
-            ).values('supplier__name').annotate(
-                spend=Sum('amount')
-            ).order_by('-spend')
-            
+        for entry in by_category.values():
+            # Only categories with more than two suppliers are candidates
+            if len(entry['suppliers']) <= 2:
+                continue
+
             opportunities.append({
-                'category': cat['category__name'],
-                'supplier_count': cat['supplier_count'],
-                'total_spend': float(cat['total_spend']),
-                'suppliers': [
-                    {
-                        'name': s['supplier__name'],
-                        'spend': float(s['spend'])
-                    }
-                    for s in suppliers
-                ],
-                'potential_savings': float(cat['total_spend'] * Decimal('0.10'))  # Estimate 10% savings
+                'category': entry['category'],
+                'supplier_count': len(entry['suppliers']),
+                'total_spend': float(entry['total_spend']),
+                'suppliers': entry['suppliers'],
+                'potential_savings': float(entry['total_spend'] * Decimal('0.10'))  # Estimate 10% savings
             })
-        
+
+        opportunities.sort(key=lambda o: o['supplier_count'], reverse=True)
         return opportunities
+
+    def get_dashboard_bundle(self, months=12, threshold_percentage=20):
+        """
+        Get all dashboard analytics in a single call.
+
+        Bundling the individual analyses lets the dashboard load with one
+        request/response cycle instead of ten sequential ones. Each piece
+        is served through the per-organization cache, so a warm dashboard
+        load does not hit the database at all.
+
+        With ANALYTICS_PARALLEL_QUERIES enabled, cold-cache loads run the
+        independent aggregations concurrently on separate database
+        connections instead of sequentially.
+        """
+        parts = {
+            'overview': self.get_overview_stats,
+            'spend_by_category': self.get_spend_by_category,
+            'spend_by_supplier': self.get_spend_by_supplier,
+            'monthly_trend': lambda: self.get_monthly_trend(months=months),
+            'pareto': self.get_pareto_analysis,
+            'tail_spend': lambda: self.get_tail_spend_analysis(
+                threshold_percentage=threshold_percentage
+            ),
+            'stratification': self.get_spend_stratification,
+            'seasonality': self.get_seasonality_analysis,
+            'year_over_year': self.get_year_over_year_comparison,
+            'consolidation': self.get_supplier_consolidation_opportunities,
+        }
+
+        if getattr(settings, 'ANALYTICS_PARALLEL_QUERIES', False):
+            return self._run_parallel(parts)
+
+        return {name: fn() for name, fn in parts.items()}
+
+    @staticmethod
+    def _run_parallel(parts):
+        """Run the bundle parts concurrently, one DB connection per thread."""
+        def call(fn):
+            try:
+                return fn()
+            finally:
+                # Each worker thread opens its own connection; close it so
+                # the pool does not leak connections between requests
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=len(parts)) as pool:
+            futures = {name: pool.submit(call, fn) for name, fn in parts.items()}
+            return {name: future.result() for name, future in futures.items()}
@@ -0,0 +1,44 @@
+"""
+Signal handlers for analytics cache invalidation
+"""
+import threading
+from contextlib import contextmanager
+
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from apps.procurement.models import Transaction
+from .services import bump_analytics_cache_version
+
+_suppressed = threading.local()
+
+
+@contextmanager
+def suppress_analytics_invalidation():
+    """Skip the per-instance cache bumps for the enclosed block.
+
+    Deleting a queryset of transactions fires one post_delete -- and
+    thus one cache round-trip -- per doomed row. Bulk code paths wrap
+    their delete in this and call bump_analytics_cache_version once per
+    affected organization themselves.
+    """
+    _suppressed.active = True
+    try:
+        yield
+    finally:
+        _suppressed.active = False
+
+
+@receiver(post_save, sender=Transaction)
+def invalidate_analytics_on_save(sender, instance, **kwargs):
+    """Invalidate cached analytics when a transaction is created or updated."""
+    if getattr(_suppressed, 'active', False):
+        return
+    bump_analytics_cache_version(instance.organization_id)
+
+
+@receiver(post_delete, sender=Transaction)
+def invalidate_analytics_on_delete(sender, instance, **kwargs):
+    """Invalidate cached analytics when a transaction is deleted."""
+    if getattr(_suppressed, 'active', False):
+        return
+    bump_analytics_cache_version(instance.organization_id)
@@ -0,0 +1,33 @@
+"""
+Celery tasks for analytics
+"""
+import logging
+from celery import shared_task
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def refresh_analytics_cache():
+    """
+    Precompute dashboard analytics for all active organizations.
+
+    Scheduled hourly via Celery beat so the expensive aggregations run in
+    the background and dashboard requests are served from the warm
+    per-organization cache instead of hitting the database.
+    """
+    from apps.authentication.models import Organization
+    from .services import AnalyticsService
+
+    refreshed = 0
+    for organization in Organization.objects.filter(is_active=True):
+        try:
+            AnalyticsService(organization).get_dashboard_bundle()
+            refreshed += 1
+        except Exception:
+            logger.exception(
+                f"Failed to refresh analytics cache for organization {organization.id}"
+            )
+
+    logger.info(f"Refreshed analytics cache for {refreshed} organizations")
+    return refreshed
@@ -482,3 +482,49 @@ class TestAnalyticsServiceEmpty:
         service = AnalyticsService(organization)
         result = service.get_supplier_consolidation_opportunities()
         assert result == []
+
+
+@pytest.mark.django_db
+class TestAnalyticsCaching:
+    """Tests for per-organization caching of analytics results."""
+
+    def test_cached_result_reused(self, organization, transaction):
+        """Test that repeated calls return the cached result."""
+        service = AnalyticsService(organization)
+        first = service.get_overview_stats()
+        second = service.get_overview_stats()
+        assert first == second
+
+    def test_cache_invalidated_on_new_transaction(self, organization, supplier, category, admin_user, transaction):
+        """Test that new transactions invalidate cached results."""
+        service = AnalyticsService(organization)
+        stats_before = service.get_overview_stats()
+
+        TransactionFactory(
+            organization=organization,
+            supplier=supplier,
+            category=category,
+            uploaded_by=admin_user,
+            amount=Decimal('500.00'),
+            invoice_number='CACHE-1'
+        )
+
+        stats_after = service.get_overview_stats()
+        assert stats_after['transaction_count'] == stats_before['transaction_count'] + 1
+
+    def test_cache_scoped_per_organization(self, organization, other_organization, transaction):
+        """Test that cached results are not shared across organizations."""
+        service = AnalyticsService(organization)
+        other_service = AnalyticsService(other_organization)
+
+        assert service.get_overview_stats()['transaction_count'] == 1
+        assert other_service.get_overview_stats()['transaction_count'] == 0
+
+    def test_cache_key_includes_method_arguments(self, organization, transaction):
+        """Test that different arguments produce independent cache entries."""
+        service = AnalyticsService(organization)
+        # Both calls should succeed and not return each other's cached value
+        default_result = service.get_tail_spend_analysis()
+        narrow_result = service.get_tail_spend_analysis(threshold_percentage=1)
+        assert isinstance(default_result, dict)
+        assert isinstance(narrow_result, dict)
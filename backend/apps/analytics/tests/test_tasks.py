@@ -0,0 +1,23 @@
+"""
+Tests for analytics tasks.
+"""
+import pytest
+from apps.analytics.tasks import refresh_analytics_cache
+
+
+@pytest.mark.django_db
+class TestRefreshAnalyticsCache:
+    """Tests for the hourly cache warming task."""
+
+    def test_refreshes_active_organizations(self, organization, other_organization, transaction):
+        """Test that the task warms the cache for every active organization."""
+        refreshed = refresh_analytics_cache()
+        assert refreshed == 2
+
+    def test_skips_inactive_organizations(self, organization):
+        """Test that inactive organizations are not refreshed."""
+        organization.is_active = False
+        organization.save()
+
+        refreshed = refresh_analytics_cache()
+        assert refreshed == 0
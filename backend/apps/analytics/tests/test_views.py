@@ -293,3 +293,75 @@ class TestAnalyticsOrganizationScoping:
         assert response.status_code == status.HTTP_200_OK
         # Should only see 1 transaction from own org
         assert response.data['transaction_count'] == 1
+
+
+@pytest.mark.django_db
+class TestDashboardBundle:
+    """Tests for the combined dashboard endpoint."""
+
+    def test_dashboard_bundle(self, authenticated_client, transaction):
+        """Test getting all dashboard analytics in one response."""
+        url = reverse('dashboard')
+        response = authenticated_client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        for key in ['overview', 'spend_by_category', 'spend_by_supplier',
+                    'monthly_trend', 'pareto', 'tail_spend', 'stratification',
+                    'seasonality', 'year_over_year', 'consolidation']:
+            assert key in response.data
+
+    def test_dashboard_bundle_params(self, authenticated_client, transaction):
+        """Test passing months/threshold parameters."""
+        url = reverse('dashboard')
+        response = authenticated_client.get(url, {'months': 6, 'threshold': 10})
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_dashboard_bundle_invalid_params(self, authenticated_client):
+        """Test that invalid parameters return an error."""
+        url = reverse('dashboard')
+        response = authenticated_client.get(url, {'months': 'abc'})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_dashboard_bundle_unauthenticated(self, api_client):
+        """Test that the endpoint requires authentication."""
+        url = reverse('dashboard')
+        response = api_client.get(url)
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+@pytest.mark.django_db
+class TestConditionalResponses:
+    """Tests for ETag-based conditional responses on analytics endpoints."""
+
+    def test_response_includes_etag(self, authenticated_client, transaction):
+        """Test that analytics responses carry an ETag header."""
+        url = reverse('overview-stats')
+        response = authenticated_client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        assert response['ETag']
+
+    def test_matching_etag_returns_304(self, authenticated_client, transaction):
+        """Test that a matching If-None-Match returns 304 Not Modified."""
+        url = reverse('overview-stats')
+        first = authenticated_client.get(url)
+        response = authenticated_client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_etag_invalidated_on_data_change(self, authenticated_client, transaction,
+                                             organization, admin_user):
+        """Test that new transaction data invalidates the ETag."""
+        url = reverse('overview-stats')
+        first = authenticated_client.get(url)
+
+        supplier = SupplierFactory(organization=organization)
+        category = CategoryFactory(organization=organization)
+        TransactionFactory(
+            organization=organization,
+            supplier=supplier,
+            category=category,
+            uploaded_by=admin_user,
+            invoice_number='ETAG-1'
+        )
+
+        response = authenticated_client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+        assert response.status_code == status.HTTP_200_OK
+        assert response['ETag'] != first['ETag']
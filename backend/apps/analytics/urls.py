@@ -6,6 +6,7 @@ from . import views
 
 urlpatterns = [
     path('overview/', views.overview_stats, name='overview-stats'),
+    path('dashboard/', views.dashboard_bundle, name='dashboard'),
     path('spend-by-category/', views.spend_by_category, name='spend-by-category'),
     path('spend-by-supplier/', views.spend_by_supplier, name='spend-by-supplier'),
     path('monthly-trend/', views.monthly_trend, name='monthly-trend'),
@@ -1,13 +1,33 @@
 """
 Analytics API views
 """
+from django.views.decorators.http import condition
 from rest_framework.decorators import api_view, permission_classes, throttle_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
-from rest_framework.throttling import ScopedRateThrottle
 from rest_framework.exceptions import ValidationError
+from apps.authentication.permissions import HasUserProfile
 from apps.authentication.utils import log_action
-from .services import AnalyticsService
+# The token-bucket throttle resolves its scope from the class itself;
+# the ScopedRateThrottle subclass it replaces only activated when the
+# view declared throttle_scope, which none of these function views do,
+# so the read_api limit was silently never enforced here.
+from apps.procurement.views import ReadAPIThrottle
+from .services import AnalyticsService, get_analytics_cache_version
+
+
+def analytics_etag(request, *args, **kwargs):
+    """
+    Compute an ETag for analytics responses.
+
+    Built from the organization's analytics cache version, which is bumped
+    whenever transaction data changes, so a matching If-None-Match header
+    means the client's cached payload is still current and the view can
+    answer 304 without running any queries or serialization.
+    """
+    organization_id = request.user.profile.organization_id
+    version = get_analytics_cache_version(organization_id)
+    return f'"analytics-{organization_id}-v{version}"'
 
 
 def validate_int_param(request, param_name, default, min_val=1, max_val=1000):
@@ -41,21 +61,14 @@ def validate_int_param(request, param_name, default, min_val=1, max_val=1000):
         })
 
 
-class ReadAPIThrottle(ScopedRateThrottle):
-    """Throttle for read API endpoints."""
-    scope = 'read_api'
-
-
 @api_view(['GET'])
-@permission_classes([IsAuthenticated])
+@permission_classes([IsAuthenticated, HasUserProfile])
 @throttle_classes([ReadAPIThrottle])
+@condition(etag_func=analytics_etag)
 def overview_stats(request):
     """
     Get overview statistics
     """
-    if not hasattr(request.user, 'profile'):
-        return Response({'error': 'User profile not found'}, status=400)
-
     service = AnalyticsService(request.user.profile.organization)
     data = service.get_overview_stats()
 
@@ -70,15 +83,37 @@ def overview_stats(request):
 
 
 @api_view(['GET'])
-@permission_classes([IsAuthenticated])
+@permission_classes([IsAuthenticated, HasUserProfile])
 @throttle_classes([ReadAPIThrottle])
+@condition(etag_func=analytics_etag)
+def dashboard_bundle(request):
+    """
+    Get all dashboard analytics in a single response
+    """
+    months = validate_int_param(request, 'months', 12, min_val=1, max_val=120)
+    threshold = validate_int_param(request, 'threshold', 20, min_val=1, max_val=100)
+
+    service = AnalyticsService(request.user.profile.organization)
+    data = service.get_dashboard_bundle(months=months, threshold_percentage=threshold)
+
+    log_action(
+        user=request.user,
+        action='view',
+        resource='analytics_dashboard',
+        request=request
+    )
+
+    return Response(data)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated, HasUserProfile])
+@throttle_classes([ReadAPIThrottle])
+@condition(etag_func=analytics_etag)
 def spend_by_category(request):
     """
     Get spend breakdown by category
     """
-    if not hasattr(request.user, 'profile'):
-        return Response({'error': 'User profile not found'}, status=400)
-
     service = AnalyticsService(request.user.profile.organization)
     data = service.get_spend_by_category()
 
@@ -86,15 +121,13 @@ def spend_by_category(request):
 
 
 @api_view(['GET'])
-@permission_classes([IsAuthenticated])
+@permission_classes([IsAuthenticated, HasUserProfile])
 @throttle_classes([ReadAPIThrottle])
+@condition(etag_func=analytics_etag)
 def spend_by_supplier(request):
     """
     Get spend breakdown by supplier
     """
-    if not hasattr(request.user, 'profile'):
-        return Response({'error': 'User profile not found'}, status=400)
-
     service = AnalyticsService(request.user.profile.organization)
     data = service.get_spend_by_supplier()
 
@@ -102,15 +135,13 @@ def spend_by_supplier(request):
 
 
 @api_view(['GET'])
-@permission_classes([IsAuthenticated])
+@permission_classes([IsAuthenticated, HasUserProfile])
 @throttle_classes([ReadAPIThrottle])
+@condition(etag_func=analytics_etag)
 def monthly_trend(request):
     """
     Get monthly spend trend
     """
-    if not hasattr(request.user, 'profile'):
-        return Response({'error': 'User profile not found'}, status=400)
-
     months = validate_int_param(request, 'months', 12, min_val=1, max_val=120)
     service = AnalyticsService(request.user.profile.organization)
     data = service.get_monthly_trend(months=months)
@@ -119,15 +150,13 @@ def monthly_trend(request):
 
 
 @api_view(['GET'])
-@permission_classes([IsAuthenticated])
+@permission_classes([IsAuthenticated, HasUserProfile])
 @throttle_classes([ReadAPIThrottle])
+@condition(etag_func=analytics_etag)
 def pareto_analysis(request):
     """
     Get Pareto analysis
     """
-    if not hasattr(request.user, 'profile'):
-        return Response({'error': 'User profile not found'}, status=400)
-
     service = AnalyticsService(request.user.profile.organization)
     data = service.get_pareto_analysis()
 
@@ -135,15 +164,13 @@ def pareto_analysis(request):
 
 
 @api_view(['GET'])
-@permission_classes([IsAuthenticated])
+@permission_classes([IsAuthenticated, HasUserProfile])
 @throttle_classes([ReadAPIThrottle])
+@condition(etag_func=analytics_etag)
 def tail_spend_analysis(request):
     """
     Get tail spend analysis
     """
-    if not hasattr(request.user, 'profile'):
-        return Response({'error': 'User profile not found'}, status=400)
-
     threshold = validate_int_param(request, 'threshold', 20, min_val=1, max_val=100)
     service = AnalyticsService(request.user.profile.organization)
     data = service.get_tail_spend_analysis(threshold_percentage=threshold)
@@ -152,15 +179,13 @@ def tail_spend_analysis(request):
 
 
 @api_view(['GET'])
-@permission_classes([IsAuthenticated])
+@permission_classes([IsAuthenticated, HasUserProfile])
 @throttle_classes([ReadAPIThrottle])
+@condition(etag_func=analytics_etag)
 def spend_stratification(request):
     """
     Get spend stratification (Kraljic Matrix)
     """
-    if not hasattr(request.user, 'profile'):
-        return Response({'error': 'User profile not found'}, status=400)
-
     service = AnalyticsService(request.user.profile.organization)
     data = service.get_spend_stratification()
 
@@ -168,15 +193,13 @@ def spend_stratification(request):
 
 
 @api_view(['GET'])
-@permission_classes([IsAuthenticated])
+@permission_classes([IsAuthenticated, HasUserProfile])
 @throttle_classes([ReadAPIThrottle])
+@condition(etag_func=analytics_etag)
 def seasonality_analysis(request):
     """
     Get seasonality analysis
     """
-    if not hasattr(request.user, 'profile'):
-        return Response({'error': 'User profile not found'}, status=400)
-
     service = AnalyticsService(request.user.profile.organization)
     data = service.get_seasonality_analysis()
 
@@ -184,15 +207,13 @@ def seasonality_analysis(request):
 
 
 @api_view(['GET'])
-@permission_classes([IsAuthenticated])
+@permission_classes([IsAuthenticated, HasUserProfile])
 @throttle_classes([ReadAPIThrottle])
+@condition(etag_func=analytics_etag)
 def year_over_year(request):
     """
     Get year over year comparison
     """
-    if not hasattr(request.user, 'profile'):
-        return Response({'error': 'User profile not found'}, status=400)
-
     service = AnalyticsService(request.user.profile.organization)
     data = service.get_year_over_year_comparison()
 
@@ -200,15 +221,13 @@ def year_over_year(request):
 
 
 @api_view(['GET'])
-@permission_classes([IsAuthenticated])
+@permission_classes([IsAuthenticated, HasUserProfile])
 @throttle_classes([ReadAPIThrottle])
+@condition(etag_func=analytics_etag)
 def consolidation_opportunities(request):
     """
     Get supplier consolidation opportunities
     """
-    if not hasattr(request.user, 'profile'):
-        return Response({'error': 'User profile not found'}, status=400)
-
     service = AnalyticsService(request.user.profile.organization)
     data = service.get_supplier_consolidation_opportunities()
 
@@ -17,6 +17,7 @@ class OrganizationAdmin(admin.ModelAdmin):
 @admin.register(UserProfile)
 class UserProfileAdmin(admin.ModelAdmin):
     list_display = ['user', 'organization', 'role', 'is_active', 'created_at']
+    list_select_related = ['user', 'organization']
     list_filter = ['role', 'is_active', 'organization', 'created_at']
     search_fields = ['user__username', 'user__email', 'organization__name']
     readonly_fields = ['created_at', 'updated_at']
@@ -25,14 +26,16 @@ class UserProfileAdmin(admin.ModelAdmin):
         qs = super().get_queryset(request)
         if request.user.is_superuser:
             return qs
-        if hasattr(request.user, 'profile'):
-            return qs.filter(organization=request.user.profile.organization)
+        profile = getattr(request.user, 'profile', None)
+        if profile is not None:
+            return qs.filter(organization_id=profile.organization_id)
         return qs.none()
 
 
 @admin.register(AuditLog)
 class AuditLogAdmin(admin.ModelAdmin):
     list_display = ['user', 'organization', 'action', 'resource', 'timestamp']
+    list_select_related = ['user', 'organization']
     list_filter = ['action', 'organization', 'timestamp']
     search_fields = ['user__username', 'resource', 'resource_id']
     readonly_fields = ['user', 'organization', 'action', 'resource', 'resource_id', 
@@ -51,6 +54,7 @@ class AuditLogAdmin(admin.ModelAdmin):
         qs = super().get_queryset(request)
         if request.user.is_superuser:
             return qs
-        if hasattr(request.user, 'profile'):
-            return qs.filter(organization=request.user.profile.organization)
+        profile = getattr(request.user, 'profile', None)
+        if profile is not None:
+            return qs.filter(organization_id=profile.organization_id)
         return qs.none()
@@ -5,6 +5,7 @@ This provides XSS protection by preventing JavaScript access to tokens.
 from django.conf import settings
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework_simplejwt.exceptions import InvalidToken, AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
 
 
 class CookieJWTAuthentication(JWTAuthentication):
@@ -13,6 +14,32 @@ class CookieJWTAuthentication(JWTAuthentication):
     Falls back to Authorization header for backwards compatibility.
     """
 
+    def get_user(self, validated_token):
+        """
+        Return the user for a validated token, with the profile prefetched.
+
+        Views and permission classes dereference user.profile.organization
+        on almost every request; selecting the profile and its organization
+        here means those accesses (and the hasattr(user, 'profile') guards)
+        hit the cached relation instead of issuing extra queries.
+        """
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken('Token contained no recognizable user identification')
+
+        try:
+            user = self.user_model.objects.select_related(
+                'profile__organization'
+            ).get(**{api_settings.USER_ID_FIELD: user_id})
+        except self.user_model.DoesNotExist:
+            raise AuthenticationFailed('User not found', code='user_not_found')
+
+        if not user.is_active:
+            raise AuthenticationFailed('User is inactive', code='user_inactive')
+
+        return user
+
     def authenticate(self, request):
         # First try to get token from cookie
         jwt_settings = settings.SIMPLE_JWT
@@ -1,7 +1,6 @@
 import secrets
-import string
 from django.core.management.base import BaseCommand
-from django.db import IntegrityError
+from django.db import IntegrityError, transaction
 from django.contrib.auth.models import User
 from django.utils.text import slugify
 from apps.authentication.models import Organization, UserProfile
@@ -23,49 +22,51 @@ class Command(BaseCommand):
 
         # Generate password if not provided
         if not password:
-            alphabet = string.ascii_letters + string.digits + string.punctuation
-            password = ''.join(secrets.choice(alphabet) for i in range(16))
+            password = secrets.token_urlsafe(16)
 
         try:
-            # 1. Create Organization
-            slug = slugify(org_name)
-            org, created = Organization.objects.get_or_create(
-                name=org_name,
-                defaults={'slug': slug}
-            )
-            
-            if created:
-                self.stdout.write(self.style.SUCCESS(f'Created Organization: {org_name} (slug: {org.slug})'))
-            else:
-                self.stdout.write(self.style.WARNING(f'Organization already exists: {org_name}'))
-
-            # 2. Create User
-            if User.objects.filter(username=username).exists():
-                self.stdout.write(self.style.ERROR(f'User {username} already exists'))
-                return
+            # Single lookup up front instead of get_or_create's
+            # SELECT + savepoint round-trips; the surrounding atomic block
+            # guarantees we never leave a half-provisioned tenant behind
+            with transaction.atomic():
+                # 1. Create Organization
+                org = Organization.objects.filter(name=org_name).first()
+                if org is None:
+                    org = Organization.objects.create(
+                        name=org_name,
+                        slug=slugify(org_name)
+                    )
+                    self.stdout.write(self.style.SUCCESS(f'Created Organization: {org_name} (slug: {org.slug})'))
+                else:
+                    self.stdout.write(self.style.WARNING(f'Organization already exists: {org_name}'))
 
-            user = User.objects.create_user(
-                username=username,
-                email=email,
-                password=password
-            )
-            self.stdout.write(self.style.SUCCESS(f'Created User: {username}'))
+                # 2. Create User
+                if User.objects.filter(username=username).exists():
+                    self.stdout.write(self.style.ERROR(f'User {username} already exists'))
+                    return
 
-            # 3. Create UserProfile (Link User to Org as Admin)
-            # Check if profile was auto-created by signal (if applicable)
-            if not hasattr(user, 'profile'):
-                UserProfile.objects.create(
-                    user=user,
-                    organization=org,
-                    role='admin',
-                    is_active=True
+                user = User.objects.create_user(
+                    username=username,
+                    email=email,
+                    password=password
                 )
-            else:
-                # Update existing profile if signal created it
-                profile = user.profile
-                profile.organization = org
-                profile.role = 'admin'
-                profile.save()
+                self.stdout.write(self.style.SUCCESS(f'Created User: {username}'))
+
+                # 3. Create UserProfile (Link User to Org as Admin)
+                # Check if profile was auto-created by signal (if applicable)
+                if not hasattr(user, 'profile'):
+                    UserProfile.objects.create(
+                        user=user,
+                        organization=org,
+                        role='admin',
+                        is_active=True
+                    )
+                else:
+                    # Update existing profile if signal created it
+                    profile = user.profile
+                    profile.organization = org
+                    profile.role = 'admin'
+                    profile.save()
 
             self.stdout.write(self.style.SUCCESS(f'Linked {username} to {org_name} as Admin'))
             
@@ -0,0 +1,36 @@
+"""
+Add a BRIN index on AuditLog.timestamp for PostgreSQL.
+
+Audit logs are append-only and physically ordered by timestamp, which is
+the access pattern BRIN is designed for: the index stays tiny (a few
+pages even for millions of rows) and keeps insert overhead minimal
+compared to a B-tree. Other backends (e.g. the SQLite test database)
+skip the index and fall back to the existing B-tree indexes.
+"""
+from django.db import migrations
+
+
+def create_brin_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS auth_auditlog_timestamp_brin '
+        'ON authentication_auditlog USING brin ("timestamp")'
+    )
+
+
+def drop_brin_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS auth_auditlog_timestamp_brin')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0002_add_preferences_to_userprofile'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_brin_index, drop_brin_index),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.0.1 on 2026-08-26 14:09
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0003_auditlog_brin_timestamp_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='userprofile',
+            index=models.Index(fields=['organization', 'is_active'], name='authenticat_organiz_686a8d_idx'),
+        ),
+    ]
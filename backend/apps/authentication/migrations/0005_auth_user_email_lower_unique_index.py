@@ -0,0 +1,32 @@
+"""
+Enforce case-insensitive email uniqueness at the database layer.
+
+RegisterSerializer used to pre-check email uniqueness with a SELECT
+before every INSERT, which both cost an extra query and left a race
+window between the check and the write. A unique index on LOWER(email)
+closes the race and lets registration rely on the database; the partial
+WHERE clause excludes the empty emails that admin-created accounts may
+share. On busy production databases the index can be created with
+CONCURRENTLY ahead of deploying this migration (it is a no-op if the
+index already exists).
+"""
+from django.conf import settings
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('authentication', '0004_userprofile_authenticat_organiz_686a8d_idx'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql=(
+                "CREATE UNIQUE INDEX IF NOT EXISTS auth_user_email_lower_uniq "
+                "ON auth_user (LOWER(email)) WHERE email <> ''"
+            ),
+            reverse_sql="DROP INDEX IF EXISTS auth_user_email_lower_uniq",
+        ),
+    ]
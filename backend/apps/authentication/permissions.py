@@ -4,17 +4,46 @@ Custom permissions for role-based access control
 from rest_framework import permissions
 
 
+def get_profile(user):
+    """
+    Return the user's profile, or None if they don't have one.
+
+    Resolves the reverse one-to-one exactly once per check instead of the
+    old hasattr probe followed by a second attribute traversal; the
+    authentication backend select_related's the profile, so this is a
+    cached-attribute read for authenticated API requests. Django's
+    RelatedObjectDoesNotExist subclasses AttributeError, so getattr with
+    a default handles both missing profiles and AnonymousUser.
+    """
+    return getattr(user, 'profile', None)
+
+
+class HasUserProfile(permissions.BasePermission):
+    """
+    Permission class requiring an authenticated user with a profile.
+
+    Centralizes the profile-existence guard that was previously repeated
+    at the top of every analytics view.
+    """
+    message = 'User profile not found'
+
+    def has_permission(self, request, view):
+        # Test the in-memory is_authenticated flag before resolving the
+        # profile, so denied requests never touch the related object
+        if not request.user.is_authenticated:
+            return False
+        return get_profile(request.user) is not None
+
+
 class IsAdmin(permissions.BasePermission):
     """
     Permission class for admin-only access
     """
     def has_permission(self, request, view):
-        return (
-            request.user and
-            request.user.is_authenticated and
-            hasattr(request.user, 'profile') and
-            request.user.profile.is_admin()
-        )
+        if not request.user.is_authenticated:
+            return False
+        profile = get_profile(request.user)
+        return profile is not None and profile.is_admin()
 
 
 class IsManager(permissions.BasePermission):
@@ -22,12 +51,10 @@ class IsManager(permissions.BasePermission):
     Permission class for manager and admin access
     """
     def has_permission(self, request, view):
-        return (
-            request.user and
-            request.user.is_authenticated and
-            hasattr(request.user, 'profile') and
-            request.user.profile.is_manager()
-        )
+        if not request.user.is_authenticated:
+            return False
+        profile = get_profile(request.user)
+        return profile is not None and profile.is_manager()
 
 
 class CanUploadData(permissions.BasePermission):
@@ -35,12 +62,10 @@ class CanUploadData(permissions.BasePermission):
     Permission class for users who can upload data
     """
     def has_permission(self, request, view):
-        return (
-            request.user and
-            request.user.is_authenticated and
-            hasattr(request.user, 'profile') and
-            request.user.profile.can_upload_data()
-        )
+        if not request.user.is_authenticated:
+            return False
+        profile = get_profile(request.user)
+        return profile is not None and profile.can_upload_data()
 
 
 class CanDeleteData(permissions.BasePermission):
@@ -48,12 +73,10 @@ class CanDeleteData(permissions.BasePermission):
     Permission class for users who can delete data
     """
     def has_permission(self, request, view):
-        return (
-            request.user and
-            request.user.is_authenticated and
-            hasattr(request.user, 'profile') and
-            request.user.profile.can_delete_data()
-        )
+        if not request.user.is_authenticated:
+            return False
+        profile = get_profile(request.user)
+        return profile is not None and profile.can_delete_data()
 
 
 class IsSuperAdmin(permissions.BasePermission):
@@ -86,15 +109,17 @@ class IsSameOrganization(permissions.BasePermission):
         if request.user.is_superuser:
             return True
 
-        if not hasattr(request.user, 'profile'):
+        profile = get_profile(request.user)
+        if profile is None:
             return False
 
         # Check if object has organization field
         if hasattr(obj, 'organization'):
-            return obj.organization == request.user.profile.organization
+            return obj.organization == profile.organization
 
         # Check if object has user field with profile
-        if hasattr(obj, 'user') and hasattr(obj.user, 'profile'):
-            return obj.user.profile.organization == request.user.profile.organization
+        obj_profile = get_profile(getattr(obj, 'user', None))
+        if obj_profile is not None:
+            return obj_profile.organization == profile.organization
 
         return False
@@ -4,6 +4,7 @@ Serializers for authentication
 from rest_framework import serializers
 from django.contrib.auth.models import User
 from django.contrib.auth.password_validation import validate_password
+from django.db import IntegrityError, transaction
 from .models import Organization, UserProfile, AuditLog
 
 
@@ -34,6 +35,21 @@ class UserProfileSerializer(serializers.ModelSerializer):
         return obj.is_super_admin()
 
 
+class UserProfileListSerializer(UserProfileSerializer):
+    """Narrow serializer for profile listings.
+
+    Leaves out preferences (JSONField decode/re-encode per row), phone
+    and department, which list consumers don't render; the full
+    serializer still backs retrieve and write actions.
+    """
+
+    class Meta(UserProfileSerializer.Meta):
+        fields = [
+            'id', 'organization', 'organization_name', 'role',
+            'is_active', 'created_at', 'is_super_admin'
+        ]
+
+
 class UserPreferencesSerializer(serializers.Serializer):
     """Serializer for user preferences update"""
     theme = serializers.ChoiceField(choices=['light', 'dark', 'system'], required=False)
@@ -49,9 +65,13 @@ class UserPreferencesSerializer(serializers.Serializer):
     sidebarCollapsed = serializers.BooleanField(required=False)
 
     def validate(self, attrs):
-        """Filter out keys not in ALLOWED_PREFERENCE_KEYS."""
-        allowed_keys = UserProfile.ALLOWED_PREFERENCE_KEYS
-        return {k: v for k, v in attrs.items() if k in allowed_keys}
+        """Return validated preferences.
+
+        The declared fields above are exactly ALLOWED_PREFERENCE_KEYS and
+        DRF has already dropped anything undeclared by this point, so the
+        old per-key filtering comprehension was dead work on every PATCH.
+        """
+        return attrs
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -77,8 +97,11 @@ class RegisterSerializer(serializers.ModelSerializer):
         required=True,
         style={'input_type': 'password'}
     )
+    # only('id'): DRF resolves the pk with queryset.get(pk=value) and
+    # create() only needs the instance for its foreign key, so there is
+    # no reason to fetch the full organization row per registration
     organization = serializers.PrimaryKeyRelatedField(
-        queryset=Organization.objects.filter(is_active=True)
+        queryset=Organization.objects.filter(is_active=True).only('id', 'is_active')
     )
     role = serializers.ChoiceField(
         choices=UserProfile.ROLE_CHOICES,
@@ -97,33 +120,37 @@ class RegisterSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError({"password": "Password fields didn't match."})
         return attrs
     
-    def validate_email(self, value):
-        if User.objects.filter(email=value).exists():
-            raise serializers.ValidationError("A user with this email already exists.")
-        return value
-    
     def create(self, validated_data):
         # Remove password_confirm and organization/role from user data
         validated_data.pop('password_confirm')
         organization = validated_data.pop('organization')
         role = validated_data.pop('role', 'viewer')
-        
-        # Create user
-        user = User.objects.create_user(
-            username=validated_data['username'],
-            email=validated_data['email'],
-            password=validated_data['password'],
-            first_name=validated_data.get('first_name', ''),
-            last_name=validated_data.get('last_name', '')
-        )
-        
-        # Create user profile
-        UserProfile.objects.create(
-            user=user,
-            organization=organization,
-            role=role
-        )
-        
+
+        # Create user and profile in one transaction: a single commit
+        # instead of two autocommits, and no orphaned User row if the
+        # profile insert fails. Email uniqueness is enforced by the
+        # database (unique index on LOWER(email)), so there is no
+        # pre-check SELECT and no race window between check and insert.
+        try:
+            with transaction.atomic():
+                user = User.objects.create_user(
+                    username=validated_data['username'],
+                    email=validated_data['email'],
+                    password=validated_data['password'],
+                    first_name=validated_data.get('first_name', ''),
+                    last_name=validated_data.get('last_name', '')
+                )
+
+                UserProfile.objects.create(
+                    user=user,
+                    organization=organization,
+                    role=role
+                )
+        except IntegrityError:
+            raise serializers.ValidationError(
+                {'email': 'A user with this email already exists.'}
+            )
+
         return user
 
 
@@ -138,14 +165,25 @@ class LoginSerializer(serializers.Serializer):
 
 
 class ChangePasswordSerializer(serializers.Serializer):
-    """Serializer for password change"""
-    old_password = serializers.CharField(required=True, write_only=True)
+    """Serializer for password change.
+
+    max_length mirrors Django's own form-level cap: without it an
+    oversized submission reaches the password hasher, whose cost scales
+    with input size — a cheap CPU-exhaustion vector. Rejecting at
+    validation never invokes the hasher for such garbage.
+    """
+    old_password = serializers.CharField(
+        required=True, write_only=True, max_length=128
+    )
     new_password = serializers.CharField(
         required=True,
         write_only=True,
+        max_length=128,
         validators=[validate_password]
     )
-    new_password_confirm = serializers.CharField(required=True, write_only=True)
+    new_password_confirm = serializers.CharField(
+        required=True, write_only=True, max_length=128
+    )
     
     def validate(self, attrs):
         if attrs['new_password'] != attrs['new_password_confirm']:
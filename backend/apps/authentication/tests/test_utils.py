@@ -405,3 +405,34 @@ class TestConstants:
         assert LOCKOUT_DURATION >= 300
         # At most 1 hour
         assert LOCKOUT_DURATION <= 3600
+
+
+@pytest.mark.django_db
+class TestAuditBuffer:
+    """Tests for request-scoped audit log buffering."""
+
+    def test_buffered_logs_flushed_in_bulk(self, admin_user):
+        """Test that buffered logs are written on flush, not before."""
+        from apps.authentication.utils import start_audit_buffer, flush_audit_buffer
+
+        start_audit_buffer()
+        log_action(user=admin_user, action='view', resource='analytics_overview')
+        log_action(user=admin_user, action='view', resource='analytics_dashboard')
+        assert AuditLog.objects.count() == 0
+
+        flush_audit_buffer()
+        assert AuditLog.objects.count() == 2
+
+    def test_unbuffered_log_written_immediately(self, admin_user):
+        """Test that log_action writes directly when no buffer is active."""
+        log = log_action(user=admin_user, action='view', resource='analytics_overview')
+        assert log.pk is not None
+        assert AuditLog.objects.count() == 1
+
+    def test_middleware_flushes_buffer(self, admin_client):
+        """Test that API requests still produce audit logs."""
+        from django.urls import reverse
+
+        response = admin_client.get(reverse('overview-stats'))
+        assert response.status_code == 200
+        assert AuditLog.objects.filter(resource='analytics_overview').exists()
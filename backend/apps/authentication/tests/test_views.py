@@ -65,6 +65,22 @@ class TestRegisterView:
         response = api_client.post(url, data)
         assert response.status_code == status.HTTP_400_BAD_REQUEST
 
+    def test_register_duplicate_email(self, api_client, organization, user):
+        """Test registration with an email that is already taken."""
+        url = reverse('register')
+        data = {
+            'username': 'newuser',
+            'email': user.email,
+            'password': 'SecurePass123!',
+            'password_confirm': 'SecurePass123!',
+            'first_name': 'New',
+            'last_name': 'User',
+            'organization': organization.id
+        }
+        response = api_client.post(url, data)
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert 'email' in response.data
+
     def test_register_weak_password(self, api_client, organization):
         """Test registration with weak password."""
         url = reverse('register')
@@ -324,6 +340,18 @@ class TestCurrentUserView:
         assert user.first_name == 'Updated'
         assert user.last_name == 'Name'
 
+    def test_get_after_update_not_stale(self, authenticated_client, user):
+        """Test that the cached /me payload is invalidated by updates."""
+        url = reverse('current-user')
+        authenticated_client.get(url)  # prime the cache
+
+        response = authenticated_client.patch(url, {'first_name': 'Fresh'})
+        assert response.status_code == status.HTTP_200_OK
+
+        response = authenticated_client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['first_name'] == 'Fresh'
+
 
 @pytest.mark.django_db
 class TestChangePasswordView:
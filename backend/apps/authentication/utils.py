@@ -3,11 +3,34 @@ Utility functions for authentication
 """
 import hashlib
 import logging
+import threading
 from django.core.cache import cache
+from django.db import transaction
 from .models import AuditLog
 
 logger = logging.getLogger('authentication')
 
+# Request-scoped audit log buffer, activated by AuditLogBufferMiddleware.
+# While active, log_action() collects entries here instead of issuing one
+# INSERT per call; the middleware flushes them in a single bulk_create.
+_audit_buffer = threading.local()
+
+
+def start_audit_buffer():
+    """Activate buffering of audit log writes for the current thread."""
+    _audit_buffer.logs = []
+
+
+def flush_audit_buffer():
+    """Write all buffered audit logs in one bulk INSERT and deactivate."""
+    logs = getattr(_audit_buffer, 'logs', None)
+    _audit_buffer.logs = None
+    if logs:
+        # One atomic multi-row INSERT; batch_size keeps statements bounded
+        # if a request ever produces an unusually large number of entries.
+        with transaction.atomic():
+            AuditLog.objects.bulk_create(logs, batch_size=1000)
+
 # Rate limiting settings for failed login attempts
 MAX_FAILED_ATTEMPTS = 5
 LOCKOUT_DURATION = 900  # 15 minutes in seconds
@@ -26,12 +49,14 @@ def get_client_ip(request):
     if x_real_ip:
         return x_real_ip.strip()
 
-    # Fall back to X-Forwarded-For (take first IP only)
+    # Fall back to X-Forwarded-For (take first IP only). partition is a
+    # single C call with no list allocation — this runs inside every
+    # log_action on the request path, so the common no-comma case
+    # shouldn't pay for a split list.
     x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
     if x_forwarded_for:
         # Only trust the first IP (closest to client)
-        ip = x_forwarded_for.split(',')[0].strip()
-        return ip
+        return x_forwarded_for.partition(',')[0].strip()
 
     # Direct connection
     return request.META.get('REMOTE_ADDR', '0.0.0.0')
@@ -76,9 +101,17 @@ def record_failed_login(request, username: str):
     ip = get_client_ip(request)
     key = get_failed_login_key(username, ip)
 
-    # Get current failed attempts
-    failed_attempts = cache.get(key, 0) + 1
-    cache.set(key, failed_attempts, LOCKOUT_DURATION)
+    # Count atomically: add() seeds the counter with its TTL only if the
+    # key is absent, then incr() bumps it server-side. One round-trip on
+    # the common path instead of a racy get-then-set pair, and concurrent
+    # failures can no longer overwrite each other's counts.
+    cache.add(key, 0, LOCKOUT_DURATION)
+    try:
+        failed_attempts = cache.incr(key)
+    except ValueError:
+        # Key expired between add() and incr(); start a fresh window
+        cache.set(key, 1, LOCKOUT_DURATION)
+        failed_attempts = 1
 
     # Log the failed attempt (don't log full username for privacy)
     logger.warning(
@@ -146,12 +179,15 @@ def log_action(user, action, resource, resource_id='', details=None, request=Non
     """
     Log user action to audit log
     """
-    if not hasattr(user, 'profile'):
+    # Resolve the reverse one-to-one once; RelatedObjectDoesNotExist
+    # subclasses AttributeError, so getattr covers missing profiles
+    profile = getattr(user, 'profile', None)
+    if profile is None:
         return None
 
     log_data = {
         'user': user,
-        'organization': user.profile.organization,
+        'organization': profile.organization,
         'action': action,
         'resource': resource,
         'resource_id': resource_id,
@@ -163,7 +199,18 @@ def log_action(user, action, resource, resource_id='', details=None, request=Non
         # Hash user agent for privacy
         log_data['user_agent'] = hash_user_agent(get_user_agent(request))
 
-    return AuditLog.objects.create(**log_data)
+    log = AuditLog(**log_data)
+    # Validate up front - the buffered path persists via bulk_create,
+    # which bypasses AuditLog.save()
+    log.full_clean()
+
+    buffered = getattr(_audit_buffer, 'logs', None)
+    if buffered is not None:
+        buffered.append(log)
+        return log
+
+    log.save()
+    return log
 
 
 def log_security_event(event_type: str, request, details: dict = None):
@@ -4,6 +4,7 @@ Authentication views
 from rest_framework import status, generics, viewsets
 from rest_framework.decorators import api_view, permission_classes, action
 from rest_framework.response import Response
+from rest_framework.pagination import CursorPagination
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.exceptions import TokenError
@@ -11,47 +12,62 @@ from django.contrib.auth import authenticate
 from django.contrib.auth.models import User
 from django.utils.decorators import method_decorator
 from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
 from django_ratelimit.decorators import ratelimit
 from .models import Organization, UserProfile, AuditLog
 from .serializers import (
     RegisterSerializer, LoginSerializer, UserSerializer,
-    OrganizationSerializer, UserProfileSerializer,
+    OrganizationSerializer, UserProfileSerializer, UserProfileListSerializer,
     ChangePasswordSerializer, AuditLogSerializer, UserPreferencesSerializer
 )
-from .permissions import IsAdmin, IsManager
+from .permissions import IsAdmin, IsManager, get_profile
 from .utils import (
     log_action, record_failed_login, check_login_lockout,
     clear_failed_logins, log_security_event
 )
 
 
+# JWT cookie parameters, resolved once at import. set_jwt_cookies runs on
+# every login/register/refresh; the SIMPLE_JWT dict and its timedeltas are
+# settings-defined constants, so there is no reason to re-probe them and
+# re-convert lifetimes to seconds per request.
+_JWT = settings.SIMPLE_JWT
+_ACCESS_COOKIE = _JWT.get('AUTH_COOKIE', 'access_token')
+_REFRESH_COOKIE = _JWT.get('AUTH_COOKIE_REFRESH', 'refresh_token')
+_ACCESS_MAX_AGE = int(_JWT['ACCESS_TOKEN_LIFETIME'].total_seconds())
+_REFRESH_MAX_AGE = int(_JWT['REFRESH_TOKEN_LIFETIME'].total_seconds())
+_COOKIE_SECURE = _JWT.get('AUTH_COOKIE_SECURE', not settings.DEBUG)
+_COOKIE_HTTPONLY = _JWT.get('AUTH_COOKIE_HTTP_ONLY', True)
+_COOKIE_SAMESITE = _JWT.get('AUTH_COOKIE_SAMESITE', 'Lax')
+_COOKIE_PATH = _JWT.get('AUTH_COOKIE_PATH', '/')
+
+
 def set_jwt_cookies(response, refresh_token):
     """
     Set HTTP-only cookies for JWT tokens.
     This prevents JavaScript access to tokens, mitigating XSS attacks.
     """
-    jwt_settings = settings.SIMPLE_JWT
-
     # Set access token cookie
     response.set_cookie(
-        key=jwt_settings.get('AUTH_COOKIE', 'access_token'),
+        key=_ACCESS_COOKIE,
         value=str(refresh_token.access_token),
-        max_age=int(jwt_settings['ACCESS_TOKEN_LIFETIME'].total_seconds()),
-        secure=jwt_settings.get('AUTH_COOKIE_SECURE', not settings.DEBUG),
-        httponly=jwt_settings.get('AUTH_COOKIE_HTTP_ONLY', True),
-        samesite=jwt_settings.get('AUTH_COOKIE_SAMESITE', 'Lax'),
-        path=jwt_settings.get('AUTH_COOKIE_PATH', '/'),
+        max_age=_ACCESS_MAX_AGE,
+        secure=_COOKIE_SECURE,
+        httponly=_COOKIE_HTTPONLY,
+        samesite=_COOKIE_SAMESITE,
+        path=_COOKIE_PATH,
     )
 
     # Set refresh token cookie
     response.set_cookie(
-        key=jwt_settings.get('AUTH_COOKIE_REFRESH', 'refresh_token'),
+        key=_REFRESH_COOKIE,
         value=str(refresh_token),
-        max_age=int(jwt_settings['REFRESH_TOKEN_LIFETIME'].total_seconds()),
-        secure=jwt_settings.get('AUTH_COOKIE_SECURE', not settings.DEBUG),
-        httponly=jwt_settings.get('AUTH_COOKIE_HTTP_ONLY', True),
-        samesite=jwt_settings.get('AUTH_COOKIE_SAMESITE', 'Lax'),
-        path=jwt_settings.get('AUTH_COOKIE_PATH', '/'),
+        max_age=_REFRESH_MAX_AGE,
+        secure=_COOKIE_SECURE,
+        httponly=_COOKIE_HTTPONLY,
+        samesite=_COOKIE_SAMESITE,
+        path=_COOKIE_PATH,
     )
 
     return response
@@ -61,16 +77,8 @@ def clear_jwt_cookies(response):
     """
     Clear JWT cookies on logout.
     """
-    jwt_settings = settings.SIMPLE_JWT
-
-    response.delete_cookie(
-        key=jwt_settings.get('AUTH_COOKIE', 'access_token'),
-        path=jwt_settings.get('AUTH_COOKIE_PATH', '/'),
-    )
-    response.delete_cookie(
-        key=jwt_settings.get('AUTH_COOKIE_REFRESH', 'refresh_token'),
-        path=jwt_settings.get('AUTH_COOKIE_PATH', '/'),
-    )
+    response.delete_cookie(key=_ACCESS_COOKIE, path=_COOKIE_PATH)
+    response.delete_cookie(key=_REFRESH_COOKIE, path=_COOKIE_PATH)
 
     return response
 
@@ -89,6 +97,11 @@ class RegisterView(generics.CreateAPIView):
         serializer.is_valid(raise_exception=True)
         user = serializer.save()
 
+        # Re-fetch with the joined profile/organization: the instance
+        # returned by save() has neither relation cached, so log_action
+        # and UserSerializer below would each lazy-load them separately.
+        user = User.objects.select_related('profile__organization').get(pk=user.pk)
+
         # Generate JWT tokens
         refresh = RefreshToken.for_user(user)
 
@@ -163,7 +176,14 @@ class LoginView(generics.GenericAPIView):
                 status=status.HTTP_401_UNAUTHORIZED
             )
 
-        if not hasattr(user, 'profile') or not user.profile.is_active:
+        # Re-fetch with the profile and organization joined: the profile
+        # check below, UserSerializer and log_action all walk
+        # profile.organization, so one JOINed query here replaces two
+        # lazy fetches later in this view
+        user = User.objects.select_related('profile__organization').get(pk=user.pk)
+
+        profile = get_profile(user)
+        if profile is None or not profile.is_active:
             # Don't reveal profile status
             record_failed_login(request, username)
             return Response(
@@ -240,10 +260,35 @@ class CurrentUserView(generics.RetrieveUpdateAPIView):
     
     def get_object(self):
         return self.request.user
-    
+
+    def retrieve(self, request, *args, **kwargs):
+        # Frontends poll this endpoint on every page load. The cache key
+        # embeds profile.updated_at, so any profile write (preferences,
+        # role changes, or the touch in update() below) naturally rolls
+        # the key over without explicit invalidation.
+        profile = get_profile(request.user)
+        if profile is None:
+            return super().retrieve(request, *args, **kwargs)
+
+        cache_key = (
+            f'user:me:{request.user.id}:{profile.updated_at.timestamp()}'
+        )
+        data = cache.get_or_set(
+            cache_key,
+            lambda: UserSerializer(request.user).data,
+            300
+        )
+        return Response(data)
+
     def update(self, request, *args, **kwargs):
         response = super().update(request, *args, **kwargs)
-        
+
+        # Touch the profile so the cached /me payload above is invalidated
+        # (User itself has no updated_at column to key on)
+        profile = get_profile(request.user)
+        if profile is not None:
+            profile.save(update_fields=['updated_at'])
+
         # Log action
         log_action(
             user=request.user,
@@ -252,7 +297,7 @@ class CurrentUserView(generics.RetrieveUpdateAPIView):
             resource_id=str(request.user.id),
             request=request
         )
-        
+
         return response
 
 
@@ -276,9 +321,10 @@ class ChangePasswordView(generics.GenericAPIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Set new password
+        # Set new password; only the password column changed, so don't
+        # rewrite the whole auth_user row
         user.set_password(serializer.validated_data['new_password'])
-        user.save()
+        user.save(update_fields=['password'])
         
         # Log action
         log_action(
@@ -309,9 +355,12 @@ class OrganizationViewSet(viewsets.ModelViewSet):
         if self.request.user.is_superuser:
             return Organization.objects.all()
         
-        if hasattr(self.request.user, 'profile'):
-            return Organization.objects.filter(id=self.request.user.profile.organization.id)
-        
+        profile = get_profile(self.request.user)
+        if profile is not None:
+            # organization_id reads the FK column off the profile row
+            # without dereferencing the related Organization object
+            return Organization.objects.filter(id=profile.organization_id)
+
         return Organization.objects.none()
 
 
@@ -321,22 +370,62 @@ class UserProfileViewSet(viewsets.ModelViewSet):
     Admins can manage users in their organization
     """
     serializer_class = UserProfileSerializer
-    
+
     def get_permissions(self):
         if self.action in ['create', 'update', 'partial_update', 'destroy']:
             return [IsAdmin()]
         return [IsAuthenticated()]
-    
+
+    def get_serializer_class(self):
+        # Listings use the narrow serializer: no preferences JSON
+        # decoding, no phone/department, smaller payload per row
+        if self.action == 'list':
+            return UserProfileListSerializer
+        return UserProfileSerializer
+
     def get_queryset(self):
         # Users can only see profiles in their organization
-        if not hasattr(self.request.user, 'profile'):
+        profile = get_profile(self.request.user)
+        if profile is None:
             return UserProfile.objects.none()
-        
-        return UserProfile.objects.filter(
-            organization=self.request.user.profile.organization
+
+        # select_related: the serializer renders user.username and
+        # organization.name, so join them up front instead of lazily
+        # fetching per row (FK/one-to-one, so a JOIN beats prefetch here).
+        # only(): project just the columns the serializer and ordering
+        # touch, keeping rows narrow on the wire and in memory; list
+        # skips the wide preferences/phone/department columns entirely.
+        fields = [
+            'id', 'role', 'is_active', 'created_at', 'organization',
+            'user__username', 'user__is_superuser', 'organization__name'
+        ]
+        if self.action != 'list':
+            fields += ['phone', 'department', 'preferences']
+
+        return UserProfile.objects.select_related('user', 'organization').only(
+            *fields
+        ).filter(
+            organization_id=profile.organization_id
         )
 
 
+class AuditLogCursorPagination(CursorPagination):
+    """
+    Keyset pagination for the audit log.
+
+    The table grows without bound and the default page-number paginator
+    uses LIMIT/OFFSET, which scans and discards offset rows — O(n) to
+    reach deep pages, plus a COUNT(*) per request. Cursor pagination
+    seeks directly via the (organization, -timestamp) index instead.
+
+    The id tie-breaker makes the ordering unique: rows flushed from the
+    same request's audit buffer share a timestamp, and CursorPagination
+    skips or repeats rows across pages on ties.
+    """
+    ordering = ('-timestamp', '-id')
+    page_size = 50
+
+
 class AuditLogViewSet(viewsets.ReadOnlyModelViewSet):
     """
     ViewSet for viewing audit logs
@@ -344,14 +433,27 @@ class AuditLogViewSet(viewsets.ReadOnlyModelViewSet):
     """
     serializer_class = AuditLogSerializer
     permission_classes = [IsManager]
+    pagination_class = AuditLogCursorPagination
+    # Default ordering for the OrderingFilter backend; cursor pagination
+    # requires a deterministic ordering at all times
+    ordering = ['-timestamp']
 
     def get_queryset(self):
         # Users can only see logs from their organization
-        if not hasattr(self.request.user, 'profile'):
+        profile = get_profile(self.request.user)
+        if profile is None:
             return AuditLog.objects.none()
 
-        return AuditLog.objects.filter(
-            organization=self.request.user.profile.organization
+        # select_related: the serializer renders user.username and
+        # organization.name for every log row. only(): project exactly
+        # the columns the serializer emits — the joined User and
+        # Organization rows contribute just one name column each.
+        return AuditLog.objects.select_related('user', 'organization').only(
+            'id', 'user', 'organization', 'action', 'resource',
+            'resource_id', 'details', 'ip_address', 'user_agent',
+            'timestamp', 'user__username', 'organization__name'
+        ).filter(
+            organization_id=profile.organization_id
         )
 
 
@@ -399,17 +501,19 @@ class UserPreferencesView(generics.GenericAPIView):
 
     def get(self, request):
         """Get current user preferences."""
-        if not hasattr(request.user, 'profile'):
+        profile = get_profile(request.user)
+        if profile is None:
             return Response(
                 {'error': 'User profile not found'},
                 status=status.HTTP_404_NOT_FOUND
             )
 
-        return Response(request.user.profile.preferences or {})
+        return Response(profile.preferences or {})
 
     def patch(self, request):
         """Update user preferences (merge with existing)."""
-        if not hasattr(request.user, 'profile'):
+        profile = get_profile(request.user)
+        if profile is None:
             return Response(
                 {'error': 'User profile not found'},
                 status=status.HTTP_404_NOT_FOUND
@@ -418,12 +522,20 @@ class UserPreferencesView(generics.GenericAPIView):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
-        # Merge with existing preferences
-        profile = request.user.profile
-        current_prefs = profile.preferences or {}
-        current_prefs.update(serializer.validated_data)
-        profile.preferences = current_prefs
-        profile.save(update_fields=['preferences', 'updated_at'])
+        # Merge with existing preferences under a row lock so two
+        # concurrent PATCHes can't read the same document and silently
+        # drop each other's keys (FOR UPDATE is a no-op on SQLite, where
+        # writes serialize on the database lock anyway)
+        with transaction.atomic():
+            profile = (
+                UserProfile.objects.select_for_update()
+                .only('id', 'preferences')
+                .get(pk=profile.pk)
+            )
+            current_prefs = profile.preferences or {}
+            current_prefs.update(serializer.validated_data)
+            profile.preferences = current_prefs
+            profile.save(update_fields=['preferences', 'updated_at'])
 
         # Log action
         log_action(
@@ -438,7 +550,8 @@ class UserPreferencesView(generics.GenericAPIView):
 
     def put(self, request):
         """Replace all user preferences."""
-        if not hasattr(request.user, 'profile'):
+        profile = get_profile(request.user)
+        if profile is None:
             return Response(
                 {'error': 'User profile not found'},
                 status=status.HTTP_404_NOT_FOUND
@@ -448,7 +561,6 @@ class UserPreferencesView(generics.GenericAPIView):
         serializer.is_valid(raise_exception=True)
 
         # Replace all preferences
-        profile = request.user.profile
         profile.preferences = serializer.validated_data
         profile.save(update_fields=['preferences', 'updated_at'])
 
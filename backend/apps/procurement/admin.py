@@ -1,23 +1,26 @@
 """
 Django admin configuration for procurement with CSV upload functionality
 """
+import secrets
+
 from django.contrib import admin
 from django.urls import path
 from django.shortcuts import render, redirect
 from django.contrib import messages
 from django.contrib.admin.views.decorators import staff_member_required
+from django.core.files.storage import default_storage
 from django.utils.decorators import method_decorator
 from django.utils.html import format_html
 
 from .models import Supplier, Category, Transaction, DataUpload
 from .forms import CSVUploadForm
-from .services import CSVProcessor
-from apps.authentication.utils import log_action
+from .tasks import process_csv_upload
 
 
 @admin.register(Supplier)
 class SupplierAdmin(admin.ModelAdmin):
     list_display = ['name', 'organization', 'code', 'is_active', 'created_at']
+    list_select_related = ['organization']
     list_filter = ['is_active', 'organization', 'created_at']
     search_fields = ['name', 'code', 'contact_email']
     readonly_fields = ['created_at', 'updated_at']
@@ -26,14 +29,16 @@ class SupplierAdmin(admin.ModelAdmin):
         qs = super().get_queryset(request)
         if request.user.is_superuser:
             return qs
-        if hasattr(request.user, 'profile'):
-            return qs.filter(organization=request.user.profile.organization)
+        profile = getattr(request.user, 'profile', None)
+        if profile is not None:
+            return qs.filter(organization_id=profile.organization_id)
         return qs.none()
 
 
 @admin.register(Category)
 class CategoryAdmin(admin.ModelAdmin):
     list_display = ['name', 'organization', 'parent', 'is_active', 'created_at']
+    list_select_related = ['organization', 'parent']
     list_filter = ['is_active', 'organization', 'created_at']
     search_fields = ['name', 'description']
     readonly_fields = ['created_at', 'updated_at']
@@ -42,31 +47,38 @@ class CategoryAdmin(admin.ModelAdmin):
         qs = super().get_queryset(request)
         if request.user.is_superuser:
             return qs
-        if hasattr(request.user, 'profile'):
-            return qs.filter(organization=request.user.profile.organization)
+        profile = getattr(request.user, 'profile', None)
+        if profile is not None:
+            return qs.filter(organization_id=profile.organization_id)
         return qs.none()
 
 
 @admin.register(Transaction)
 class TransactionAdmin(admin.ModelAdmin):
     list_display = ['date', 'supplier', 'category', 'amount', 'organization', 'uploaded_by']
+    list_select_related = ['supplier', 'category', 'organization', 'uploaded_by']
     list_filter = ['organization', 'date', 'fiscal_year', 'supplier', 'category']
     search_fields = ['description', 'invoice_number', 'supplier__name', 'category__name']
     readonly_fields = ['created_at', 'updated_at']
     date_hierarchy = 'date'
+    # raw_id_fields: the change form renders a pk input instead of a
+    # dropdown that SELECTs every supplier/category row
+    raw_id_fields = ['supplier', 'category']
     
     def get_queryset(self, request):
         qs = super().get_queryset(request)
         if request.user.is_superuser:
             return qs
-        if hasattr(request.user, 'profile'):
-            return qs.filter(organization=request.user.profile.organization)
+        profile = getattr(request.user, 'profile', None)
+        if profile is not None:
+            return qs.filter(organization_id=profile.organization_id)
         return qs.none()
 
 
 @admin.register(DataUpload)
 class DataUploadAdmin(admin.ModelAdmin):
     list_display = ['file_name', 'organization', 'uploaded_by', 'status_badge', 'successful_rows', 'failed_rows', 'duplicate_rows', 'created_at']
+    list_select_related = ['organization', 'uploaded_by']
     list_filter = ['status', 'organization', 'created_at']
     search_fields = ['file_name', 'batch_id']
     readonly_fields = ['file_name', 'file_size', 'batch_id', 'total_rows', 'successful_rows',
@@ -107,8 +119,9 @@ class DataUploadAdmin(admin.ModelAdmin):
         qs = super().get_queryset(request)
         if request.user.is_superuser:
             return qs
-        if hasattr(request.user, 'profile'):
-            return qs.filter(organization=request.user.profile.organization)
+        profile = getattr(request.user, 'profile', None)
+        if profile is not None:
+            return qs.filter(organization_id=profile.organization_id)
         return qs.none()
 
     def has_add_permission(self, request):
@@ -128,10 +141,13 @@ class DataUploadAdmin(admin.ModelAdmin):
         """Custom view for CSV upload"""
         # Check permission - only admin/manager roles or superuser
         if not request.user.is_superuser:
-            if not hasattr(request.user, 'profile'):
+            profile = getattr(request.user, 'profile', None)
+            if profile is None:
                 messages.error(request, 'You do not have a user profile. Contact an administrator.')
                 return redirect('..')
-            if request.user.profile.role not in ['admin', 'manager']:
+            # Set-membership capability check shared with the DRF
+            # permission classes -- no per-request list building
+            if not profile.can_upload_data():
                 messages.error(request, 'Only Admins and Managers can upload data.')
                 return redirect('..')
 
@@ -147,59 +163,40 @@ class DataUploadAdmin(admin.ModelAdmin):
                     # Check if super admin is doing multi-org upload
                     is_super_admin = request.user.is_superuser
 
-                    processor = CSVProcessor(
+                    # Save the file and hand processing to Celery: a
+                    # large import no longer blocks this request (and a
+                    # gunicorn worker) for minutes. The DataUpload row
+                    # is created before queueing -- mirroring the API
+                    # endpoint -- so a validation failure inside the
+                    # worker is recorded on it as a visible 'failed'
+                    # entry instead of vanishing.
+                    file = form.cleaned_data['file']
+                    upload = DataUpload.objects.create(
                         organization=organization,
-                        user=request.user,
-                        file=form.cleaned_data['file'],
+                        uploaded_by=request.user,
+                        file_name=file.name,
+                        file_size=file.size,
+                        batch_id=secrets.token_urlsafe(32),
+                        status='processing'
+                    )
+                    file_path = default_storage.save(f'csv_uploads/{file.name}', file)
+                    process_csv_upload.delay(
+                        file_path=file_path,
+                        organization_id=organization.id,
+                        user_id=request.user.id,
                         skip_duplicates=form.cleaned_data.get('skip_duplicates', True),
-                        allow_multi_org=is_super_admin
+                        allow_multi_org=is_super_admin,
+                        upload_id=upload.id,
                     )
 
-                    upload = processor.process()
-
-                    # Build audit details
-                    audit_details = {
-                        'file_name': upload.file_name,
-                        'successful': upload.successful_rows,
-                        'failed': upload.failed_rows,
-                        'duplicates': upload.duplicate_rows
-                    }
-
-                    # Include affected organizations for super admin multi-org uploads
-                    if is_super_admin and len(processor.orgs_affected) > 0:
-                        audit_details['organizations_affected'] = list(processor.orgs_affected)
-
-                    log_action(
-                        user=request.user,
-                        action='upload',
-                        resource='transactions',
-                        resource_id=upload.batch_id,
-                        details=audit_details,
-                        request=request
+                    messages.info(
+                        request,
+                        f'"{file.name}" received and queued for processing. '
+                        'Refresh this page to see the import status.'
                     )
 
-                    # Success message with details
-                    if upload.status == 'completed':
-                        messages.success(
-                            request,
-                            f'Successfully uploaded {upload.successful_rows} transactions from "{upload.file_name}".'
-                        )
-                    elif upload.status == 'partial':
-                        messages.warning(
-                            request,
-                            f'Uploaded {upload.successful_rows} transactions, '
-                            f'{upload.failed_rows} failed, {upload.duplicate_rows} duplicates skipped.'
-                        )
-                    else:
-                        messages.error(
-                            request,
-                            f'Upload failed. {upload.failed_rows} rows had errors.'
-                        )
-
                     return redirect('..')
 
-                except ValueError as e:
-                    messages.error(request, f'Upload error: {str(e)}')
                 except Exception as e:
                     messages.error(request, f'Unexpected error: {str(e)}')
         else:
@@ -61,7 +61,8 @@ class CSVUploadForm(forms.Form):
             return selected_org
 
         # Fall back to user's organization
-        if self.user and hasattr(self.user, 'profile'):
-            return self.user.profile.organization
+        profile = getattr(self.user, 'profile', None) if self.user else None
+        if profile is not None:
+            return profile.organization
 
         return None
@@ -0,0 +1,28 @@
+# Generated by Django 5.0.1 on 2026-08-26 13:57
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0002_add_preferences_to_userprofile'),
+        ('procurement', '0003_category_uuid_dataupload_original_file_name_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['organization', 'supplier', 'amount'], name='proc_tx_org_supplier_amount'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['organization', 'category', 'amount'], name='proc_tx_org_category_amount'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['organization', 'date', 'amount'], name='proc_tx_org_date_amount'),
+        ),
+    ]
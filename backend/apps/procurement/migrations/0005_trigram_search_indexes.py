@@ -0,0 +1,47 @@
+# Trigram (pg_trgm) GIN indexes backing DRF SearchFilter.
+#
+# SearchFilter emits ILIKE '%q%' for the declared search_fields, which a
+# btree can't serve -- every search is a sequential scan. pg_trgm GIN
+# indexes answer infix ILIKE directly. PostgreSQL-only: on other backends
+# (SQLite in tests) this migration is a no-op and searches keep their
+# existing behaviour.
+
+from django.db import migrations
+
+TRIGRAM_INDEXES = [
+    ('procurement_supplier', 'name', 'proc_supplier_name_trgm'),
+    ('procurement_supplier', 'code', 'proc_supplier_code_trgm'),
+    ('procurement_category', 'name', 'proc_category_name_trgm'),
+    ('procurement_category', 'description', 'proc_category_desc_trgm'),
+    ('procurement_transaction', 'description', 'proc_tx_desc_trgm'),
+    ('procurement_transaction', 'invoice_number', 'proc_tx_invoice_trgm'),
+]
+
+
+def add_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for table, column, name in TRIGRAM_INDEXES:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {name} ON {table} '
+            f'USING gin ({column} gin_trgm_ops)'
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for _table, _column, name in TRIGRAM_INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('procurement', '0004_transaction_proc_tx_org_supplier_amount_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_trigram_indexes, drop_trigram_indexes),
+    ]
@@ -183,6 +183,20 @@ class Transaction(models.Model):
             models.Index(fields=['organization', 'supplier']),
             models.Index(fields=['organization', 'category']),
             models.Index(fields=['organization', 'fiscal_year']),
+            # Composite indexes covering the analytics GROUP BY queries so
+            # spend aggregations can be answered with index-only scans
+            models.Index(
+                fields=['organization', 'supplier', 'amount'],
+                name='proc_tx_org_supplier_amount',
+            ),
+            models.Index(
+                fields=['organization', 'category', 'amount'],
+                name='proc_tx_org_category_amount',
+            ),
+            models.Index(
+                fields=['organization', 'date', 'amount'],
+                name='proc_tx_org_date_amount',
+            ),
             models.Index(fields=['upload_batch']),
             models.Index(fields=['uuid']),
         ]
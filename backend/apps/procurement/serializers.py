@@ -2,7 +2,11 @@
 Serializers for procurement data
 """
 import logging
+from decimal import Decimal
+from django.db.models import Count, DecimalField, Sum, Value
+from django.db.models.functions import Coalesce
 from rest_framework import serializers
+from apps.analytics.services import bump_analytics_cache_version
 from .models import Supplier, Category, Transaction, DataUpload
 
 # Try to import python-magic for robust file type validation
@@ -16,6 +20,15 @@ except ImportError:
 logger = logging.getLogger(__name__)
 
 
+def _total_spend_expr():
+    """SUM of related transaction amounts, with 0 instead of NULL when
+    there are none -- keeps the serialized field numeric."""
+    return Coalesce(
+        Sum('transactions__amount'),
+        Value(Decimal('0'), output_field=DecimalField(max_digits=15, decimal_places=2))
+    )
+
+
 class SupplierSerializer(serializers.ModelSerializer):
     """Serializer for Supplier model"""
     transaction_count = serializers.IntegerField(read_only=True)
@@ -34,6 +47,19 @@ class SupplierSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['id', 'created_at', 'updated_at']
 
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        """Attach the aggregates this serializer's fields read.
+
+        Keeps the queryset requirements next to the fields that create
+        them, so every view serving this serializer applies the same
+        single-query aggregation.
+        """
+        return queryset.annotate(
+            transaction_count=Count('transactions'),
+            total_spend=_total_spend_expr()
+        )
+
 
 class CategorySerializer(serializers.ModelSerializer):
     """Serializer for Category model"""
@@ -54,6 +80,14 @@ class CategorySerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['id', 'created_at', 'updated_at']
 
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        """Attach the join and aggregates this serializer's fields read."""
+        return queryset.select_related('parent').annotate(
+            transaction_count=Count('transactions'),
+            total_spend=_total_spend_expr()
+        )
+
 
 class TransactionSerializer(serializers.ModelSerializer):
     """Serializer for Transaction model"""
@@ -72,6 +106,97 @@ class TransactionSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['id', 'uploaded_by', 'created_at', 'updated_at']
 
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        """Attach the joins this serializer's name fields read.
+
+        The projection is restricted to the columns the serializer
+        actually emits: without only(), select_related drags every
+        column of the joined supplier/category/user rows (addresses,
+        password hashes, ...) across the wire for each transaction.
+        'organization' stays in the projection because the object-level
+        permission check reads it on detail routes.
+        """
+        return queryset.select_related(
+            'supplier', 'category', 'uploaded_by'
+        ).only(
+            'id', 'supplier', 'supplier__name', 'category', 'category__name',
+            'amount', 'date', 'description', 'subcategory', 'location',
+            'fiscal_year', 'spend_band', 'payment_method', 'invoice_number',
+            'upload_batch', 'uploaded_by', 'uploaded_by__username',
+            'organization', 'created_at', 'updated_at'
+        )
+
+
+class TransactionListCreateSerializer(serializers.ListSerializer):
+    """Batched create path for TransactionCreateSerializer(many=True).
+
+    The default ListSerializer.create calls the child per item, which
+    re-runs the supplier/category get_or_create plus one INSERT per
+    row. This resolves all referenced names with a single upsert per
+    model and persists the whole batch with bulk_create.
+    """
+
+    def create(self, validated_data):
+        request = self.context['request']
+        organization = request.user.profile.organization
+
+        supplier_map = self._resolve_names(
+            Supplier, organization,
+            {item['supplier_name'] for item in validated_data
+             if item.get('supplier_name') and not item.get('supplier')}
+        )
+        category_map = self._resolve_names(
+            Category, organization,
+            {item['category_name'] for item in validated_data
+             if item.get('category_name') and not item.get('category')}
+        )
+
+        objs = []
+        for item in validated_data:
+            data = dict(item)
+            supplier_name = data.pop('supplier_name', None)
+            category_name = data.pop('category_name', None)
+            if supplier_name and not data.get('supplier'):
+                data['supplier_id'] = supplier_map[supplier_name]
+            if category_name and not data.get('category'):
+                data['category_id'] = category_map[category_name]
+            data['organization'] = organization
+            data['uploaded_by'] = request.user
+            objs.append(Transaction(**data))
+
+        created = Transaction.objects.bulk_create(objs, batch_size=1000)
+
+        # bulk_create skips post_save, so the analytics invalidation
+        # signal never fires for the batched path; bump the version
+        # directly like the single-object save() does via its signal
+        bump_analytics_cache_version(organization.id)
+
+        return created
+
+    @staticmethod
+    def _resolve_names(model, organization, names):
+        """Map names to pks, creating missing rows in one INSERT."""
+        if not names:
+            return {}
+
+        def fetch():
+            return dict(
+                model.objects.filter(
+                    organization=organization, name__in=names
+                ).values_list('name', 'id')
+            )
+
+        resolved = fetch()
+        missing = [
+            model(organization=organization, name=name)
+            for name in names if name not in resolved
+        ]
+        if missing:
+            model.objects.bulk_create(missing, ignore_conflicts=True)
+            resolved = fetch()
+        return resolved
+
 
 class TransactionCreateSerializer(serializers.ModelSerializer):
     """Serializer for creating transactions"""
@@ -87,6 +212,7 @@ class TransactionCreateSerializer(serializers.ModelSerializer):
             'amount', 'date', 'description', 'subcategory', 'location',
             'fiscal_year', 'spend_band', 'payment_method', 'invoice_number'
         ]
+        list_serializer_class = TransactionListCreateSerializer
 
     def validate(self, attrs):
         """Ensure either supplier/category ID or name is provided."""
@@ -147,6 +273,19 @@ class TransactionCreateSerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
 
+class ExportFilterSerializer(serializers.Serializer):
+    """Typed query parameters for the transaction CSV export.
+
+    Validates up front so a malformed date is a 400 with a field error
+    instead of failing inside the ORM mid-request, and hands the
+    service real date/int values rather than raw query strings.
+    """
+    start_date = serializers.DateField(required=False)
+    end_date = serializers.DateField(required=False)
+    supplier = serializers.IntegerField(required=False)
+    category = serializers.IntegerField(required=False)
+
+
 class TransactionBulkDeleteSerializer(serializers.Serializer):
     """Serializer for bulk delete operations"""
     ids = serializers.ListField(
@@ -6,15 +6,21 @@ Business logic for procurement data processing with security enhancements:
 - Cryptographically secure batch IDs
 - Multi-organization support for super admins
 """
+import csv
+import functools
 import pandas as pd
+import re
 import secrets
 import logging
 from datetime import datetime
-from decimal import Decimal, InvalidOperation
-from django.db import models, transaction, IntegrityError
+from decimal import Decimal
+from django.db import transaction
 from django.db.models import Q
 from django.utils import timezone
+from django.utils.functional import cached_property
 from .models import Supplier, Category, Transaction, DataUpload
+from apps.analytics.services import bump_analytics_cache_version
+from apps.analytics.signals import suppress_analytics_invalidation
 from apps.authentication.models import Organization
 
 logger = logging.getLogger(__name__)
@@ -25,11 +31,31 @@ FORMULA_CHARS = ('=', '+', '-', '@', '\t', '\r', '\n')
 # Maximum rows to process in a single upload
 MAX_ROWS_PER_UPLOAD = 50000
 
+# Rows per streamed CSV chunk (bounds peak memory during ingest)
+CSV_CHUNK_ROWS = 10000
 
+# Maximum row errors kept for the upload's error log preview
+MAX_LOGGED_ERRORS = 100
+
+# Error-message fragments that suggest leaked internals (SQL details,
+# driver names, file paths, tracebacks); matched in one pass
+_SENSITIVE_MESSAGE_RE = re.compile(
+    r'DETAIL:|SQL|psycopg2|postgresql|/app/|/home/|Traceback|File "',
+    re.IGNORECASE,
+)
+
+
+@functools.lru_cache(maxsize=4096)
 def sanitize_csv_value(value: str) -> str:
     """
     Sanitize a CSV value to prevent formula injection.
     Prefixes dangerous characters with a single quote.
+
+    Memoized: the function is pure and imports/exports call it for
+    every cell of every string column, where values like payment
+    methods, spend bands and repeated supplier names recur thousands of
+    times. After warm-up the common case is one cache-dict lookup
+    instead of a strip/scan/allocate.
     """
     if not value or not isinstance(value, str):
         return value
@@ -44,6 +70,22 @@ def sanitize_csv_value(value: str) -> str:
     return value
 
 
+def detect_csv_encoding(sample: bytes) -> str:
+    """
+    Pick the codec a CSV byte sample decodes with: UTF-8 when it
+    decodes cleanly, latin-1 otherwise (latin-1 accepts any byte).
+
+    Validation and parsing share this so a file that passes validation
+    as latin-1 is also *read* as latin-1 instead of crashing pandas'
+    UTF-8 default mid-import.
+    """
+    try:
+        sample.decode('utf-8')
+        return 'utf-8'
+    except UnicodeDecodeError:
+        return 'latin-1'
+
+
 def validate_csv_file(file) -> tuple[bool, str]:
     """
     Validate that a file is actually a CSV file.
@@ -67,15 +109,8 @@ def validate_csv_file(file) -> tuple[bool, str]:
         if b'\x00' in first_bytes:
             return False, "File appears to be binary, not CSV"
 
-        # Try to decode as UTF-8
-        try:
-            first_bytes.decode('utf-8')
-        except UnicodeDecodeError:
-            # Try common encodings
-            try:
-                first_bytes.decode('latin-1')
-            except UnicodeDecodeError:
-                return False, "File encoding not recognized"
+        # Decodability check; latin-1 is the catch-all fallback
+        detect_csv_encoding(first_bytes)
 
     except Exception as e:
         logger.warning(f"CSV validation error: {e}")
@@ -96,7 +131,8 @@ class CSVProcessor:
         'spend_band', 'payment_method', 'invoice_number', 'organization'
     ]
 
-    def __init__(self, organization, user, file, skip_duplicates=True, allow_multi_org=False):
+    def __init__(self, organization, user, file, skip_duplicates=True, allow_multi_org=False,
+                 upload=None):
         """
         Initialize CSV processor.
 
@@ -107,15 +143,20 @@ class CSVProcessor:
             skip_duplicates: Whether to skip duplicate records
             allow_multi_org: If True, allows organization column to specify different orgs
                              (only for super admins)
+            upload: Existing DataUpload row to record results on. Callers
+                    that queue processing create the row up front so the
+                    client has something to poll; when omitted, process()
+                    creates one.
         """
         self.default_organization = organization
         self.user = user
         self.file = file
         self.skip_duplicates = skip_duplicates
         self.allow_multi_org = allow_multi_org
+        self.upload = upload
         # Use cryptographically secure token instead of UUID
         # This prevents batch ID guessing/enumeration attacks
-        self.batch_id = secrets.token_urlsafe(32)
+        self.batch_id = upload.batch_id if upload is not None else secrets.token_urlsafe(32)
         self.errors = []
         self.stats = {
             'total': 0,
@@ -136,35 +177,74 @@ class CSVProcessor:
         # Validate file first
         is_valid, error_msg = validate_csv_file(self.file)
         if not is_valid:
+            if self.upload is not None:
+                self.upload.status = 'failed'
+                self.upload.error_log = [{'error': error_msg}]
+                self.upload.completed_at = timezone.now()
+                self.upload.save()
             raise ValueError(f"Invalid file: {error_msg}")
 
-        # Create upload record (uses default org for the record itself)
-        upload = DataUpload.objects.create(
-            organization=self.default_organization,
-            uploaded_by=self.user,
-            file_name=self.file.name,
-            file_size=self.file.size,
-            batch_id=self.batch_id,
-            status='processing'
-        )
+        # Record results on the caller's upload row, or create one
+        # (uses default org for the record itself)
+        upload = self.upload
+        if upload is None:
+            upload = DataUpload.objects.create(
+                organization=self.default_organization,
+                uploaded_by=self.user,
+                file_name=self.file.name,
+                file_size=self.file.size,
+                batch_id=self.batch_id,
+                status='processing'
+            )
 
         try:
-            # Read CSV
-            df = pd.read_csv(self.file)
-            self.stats['total'] = len(df)
-
-            # Check row limit
-            if len(df) > MAX_ROWS_PER_UPLOAD:
-                raise ValueError(
-                    f"File contains {len(df)} rows, maximum allowed is {MAX_ROWS_PER_UPLOAD}"
+            # Detect the encoding once from the head of the file so the
+            # reader decodes with the same codec validation accepted --
+            # a latin-1 file must not hit pandas' UTF-8 default.
+            self.file.seek(0)
+            encoding = detect_csv_encoding(self.file.read(1024))
+            self.file.seek(0)
+
+            # Stream the CSV in chunks instead of materializing the
+            # whole file as one DataFrame: peak memory is O(chunk), not
+            # O(file), and each chunk flows through the batch pipeline.
+            # The reader keeps a continuous row index across chunks, so
+            # error-log row numbers are unaffected.
+            #
+            # usecols drops columns the importer never reads before they
+            # are materialized, and dtype=str skips type inference: every
+            # cell arrives as the string the file contains (no float64
+            # round-trips turning a fiscal_year of 2024 into '2024.0'),
+            # which is what the downstream parsing expects anyway.
+            known_columns = frozenset(self.REQUIRED_COLUMNS + self.OPTIONAL_COLUMNS)
+            first_chunk = True
+            for chunk in pd.read_csv(self.file, chunksize=CSV_CHUNK_ROWS,
+                                     encoding=encoding,
+                                     usecols=lambda c: c in known_columns,
+                                     dtype=str):
+                if first_chunk:
+                    self._validate_columns(chunk)
+                    first_chunk = False
+
+                # Enforce the row limit before touching the chunk so an
+                # oversized file fails as early as possible.
+                self.stats['total'] += len(chunk)
+                if self.stats['total'] > MAX_ROWS_PER_UPLOAD:
+                    raise ValueError(
+                        f"File contains more than {MAX_ROWS_PER_UPLOAD} rows, "
+                        f"maximum allowed is {MAX_ROWS_PER_UPLOAD}"
+                    )
+
+                self._process_rows(chunk)
+
+            if first_chunk:
+                # Header-only file: no chunks were yielded, but the
+                # columns should still be validated.
+                self.file.seek(0)
+                self._validate_columns(
+                    pd.read_csv(self.file, nrows=0, encoding=encoding)
                 )
 
-            # Validate columns
-            self._validate_columns(df)
-
-            # Process rows
-            self._process_rows(df)
-
             # Update upload record
             upload.total_rows = self.stats['total']
             upload.successful_rows = self.stats['successful']
@@ -184,6 +264,23 @@ class CSVProcessor:
 
         except Exception as e:
             logger.error(f"CSV processing error: {e}")
+            # Chunks commit in their own transactions, so a mid-file
+            # failure (e.g. the row cap firing on a later chunk) may
+            # have already persisted earlier chunks. Delete the batch's
+            # rows so a failed upload imports nothing, matching the
+            # whole-file behaviour before chunked streaming. Per-row
+            # signal bumps are suppressed in favour of one bump per
+            # affected organization.
+            doomed = Transaction.objects.filter(upload_batch=self.batch_id)
+            doomed_org_ids = set(doomed.values_list('organization_id', flat=True).distinct())
+            with suppress_analytics_invalidation():
+                doomed.delete()
+            for org_id in doomed_org_ids:
+                bump_analytics_cache_version(org_id)
+            upload.total_rows = self.stats['total']
+            upload.successful_rows = 0
+            upload.failed_rows = self.stats['failed']
+            upload.duplicate_rows = self.stats['duplicates']
             upload.status = 'failed'
             upload.error_log = [{'error': self._sanitize_error_message(str(e))}]
             upload.completed_at = timezone.now()
@@ -195,7 +292,7 @@ class CSVProcessor:
     def _sanitize_error_log(self) -> list:
         """Sanitize error log to remove sensitive data"""
         sanitized = []
-        for error in self.errors[:100]:  # Limit to 100 errors
+        for error in self.errors[:MAX_LOGGED_ERRORS]:
             sanitized.append({
                 'row': error.get('row', 0),
                 'error': self._sanitize_error_message(error.get('error', 'Unknown error')),
@@ -205,15 +302,8 @@ class CSVProcessor:
 
     def _sanitize_error_message(self, message: str) -> str:
         """Remove potentially sensitive information from error messages"""
-        sensitive_patterns = [
-            'DETAIL:', 'SQL', 'psycopg2', 'postgresql',
-            '/app/', '/home/', 'Traceback', 'File "'
-        ]
-
-        message_lower = message.lower()
-        for pattern in sensitive_patterns:
-            if pattern.lower() in message_lower:
-                return 'An error occurred while processing this row.'
+        if _SENSITIVE_MESSAGE_RE.search(message):
+            return 'An error occurred while processing this row.'
 
         # Truncate long messages
         if len(message) > 200:
@@ -227,6 +317,18 @@ class CSVProcessor:
         if missing:
             raise ValueError(f"Missing required columns: {', '.join(missing)}")
 
+    @cached_property
+    def _valid_org_sample(self):
+        """Comma-joined sample of valid organization names for error
+        messages, fetched once per upload instead of once per bad row."""
+        valid_orgs = list(Organization.objects.filter(
+            is_active=True
+        ).values_list('name', flat=True)[:10])
+        valid_list = ', '.join(valid_orgs)
+        if len(valid_orgs) == 10:
+            valid_list += ', ...'
+        return valid_list
+
     def _resolve_organization(self, org_identifier: str, row_index: int) -> Organization:
         """
         Resolve organization by name or slug.
@@ -258,17 +360,9 @@ class CSVProcessor:
         ).first()
 
         if not org:
-            # Get list of valid organizations for helpful error message
-            valid_orgs = list(Organization.objects.filter(
-                is_active=True
-            ).values_list('name', flat=True)[:10])
-            valid_list = ', '.join(valid_orgs)
-            if len(valid_orgs) == 10:
-                valid_list += ', ...'
-
             raise ValueError(
                 f"Row {row_index + 2}: Organization '{org_identifier}' not found. "
-                f"Valid organizations: {valid_list}"
+                f"Valid organizations: {self._valid_org_sample}"
             )
 
         # Cache the result
@@ -276,142 +370,319 @@ class CSVProcessor:
         return org
 
     def _process_rows(self, df):
-        """Process each row in the dataframe"""
-        for index, row in df.iterrows():
-            try:
-                self._process_row(row, index)
-                self.stats['successful'] += 1
-            except Exception as e:
-                self.stats['failed'] += 1
-                self.errors.append({
-                    'row': index + 2,  # +2 for header and 0-indexing
-                    'error': str(e),
-                    # Don't store raw data for security
-                })
-
-    @transaction.atomic
-    def _process_row(self, row, index):
-        """Process a single row with formula injection prevention"""
-        # Resolve organization for this row
-        if self.allow_multi_org and 'organization' in row and pd.notna(row['organization']):
-            organization = self._resolve_organization(str(row['organization']), index)
-        else:
-            organization = self.default_organization
+        """Process the dataframe as one vectorized batch.
 
-        # Track affected organizations for audit logging
-        self.orgs_affected.add(organization.name)
-
-        # Get or create supplier (sanitize name)
-        supplier_name = sanitize_csv_value(str(row['supplier']).strip())
-        if not supplier_name or supplier_name == "'":
-            raise ValueError("Supplier name is required")
-
-        supplier, _ = Supplier.objects.get_or_create(
-            organization=organization,
-            name=supplier_name,
-            defaults={'is_active': True}
-        )
+        Normalization runs column-at-a-time in pandas instead of cell-
+        at-a-time in Python, suppliers and categories are upserted once
+        per unique name, and the transactions land in batched multi-row
+        INSERTs. The old per-row loop issued 3-5 queries per row, which
+        dominated large uploads.
+        """
+        # Vectorized parsing: bad cells become NaT/NaN here and are
+        # reported per row below instead of raising mid-batch.
+        dates = pd.to_datetime(df['date'], errors='coerce', cache=True)
+        amount_strs = df['amount'].astype(str).str.replace(r'[,$]', '', regex=True).str.strip()
+        amount_values = pd.to_numeric(amount_strs, errors='coerce')
+        supplier_names = df['supplier'].map(self._clean_name)
+        category_names = df['category'].map(self._clean_name)
+        organizations = self._resolve_row_organizations(df)
+
+        # Optional columns, sanitized in bulk; None means "not provided"
+        # so the model defaults apply.
+        optional = {}
+        for col in self.OPTIONAL_COLUMNS:
+            if col in ('invoice_number', 'organization') or col not in df.columns:
+                continue
+            optional[col] = df[col].map(self._clean_optional)
+        if 'invoice_number' in df.columns:
+            invoices = df['invoice_number'].map(self._clean_optional)
+        else:
+            invoices = None
+
+        # Validate rows, preserving the old per-row error messages and
+        # check order (organization, supplier, category, date, amount).
+        valid = []
+        for pos, index in enumerate(df.index):
+            organization = organizations[pos]
+            if isinstance(organization, str):
+                # _resolve_organization error message for this row
+                self._record_error(index, organization)
+                continue
+            if not supplier_names.iloc[pos]:
+                self._record_error(index, "Supplier name is required")
+                continue
+            if not category_names.iloc[pos]:
+                self._record_error(index, "Category name is required")
+                continue
+            if pd.isna(dates.iloc[pos]):
+                self._record_error(index, f"Invalid date format: {df['date'].iloc[pos]}")
+                continue
+            amount = amount_values.iloc[pos]
+            if pd.isna(amount) or amount < 0 or amount > 999999999999.99:
+                self._record_error(index, f"Invalid amount value: {df['amount'].iloc[pos]}")
+                continue
+            self.orgs_affected.add(organization.name)
+            valid.append(pos)
 
-        # Get or create category (sanitize name)
-        category_name = sanitize_csv_value(str(row['category']).strip())
-        if not category_name or category_name == "'":
-            raise ValueError("Category name is required")
+        supplier_pairs = {
+            (organizations[pos].id, supplier_names.iloc[pos]) for pos in valid
+        }
+        category_pairs = {
+            (organizations[pos].id, category_names.iloc[pos]) for pos in valid
+        }
+        org_ids = {organizations[pos].id for pos in valid}
+
+        # Existing duplicate keys, fetched once: membership tests against
+        # this set replace the old per-row query/IntegrityError dance.
+        # Restricting to the file's own date span keeps the set small --
+        # rows outside that range can't collide with anything we insert.
+        existing_keys = set()
+        if valid:
+            valid_dates = dates.iloc[valid]
+            existing_keys = set(
+                Transaction.objects.filter(
+                    organization_id__in=org_ids,
+                    date__range=(valid_dates.min().date(), valid_dates.max().date()),
+                ).values_list(
+                    'organization_id', 'supplier_id', 'category_id',
+                    'amount', 'date', 'invoice_number'
+                )
+            )
 
-        category, _ = Category.objects.get_or_create(
-            organization=organization,
-            name=category_name,
-            defaults={'is_active': True}
+        # One transaction for all writes: two upserts plus the batched
+        # inserts, instead of a SAVEPOINT pair per row.
+        with transaction.atomic():
+            supplier_map = self._bulk_resolve(Supplier, supplier_pairs)
+            category_map = self._bulk_resolve(Category, category_pairs)
+
+            objs = []
+            for pos in valid:
+                index = df.index[pos]
+                organization = organizations[pos]
+                supplier_id = supplier_map[(organization.id, supplier_names.iloc[pos])]
+                category_id = category_map[(organization.id, category_names.iloc[pos])]
+                amount = Decimal(amount_strs.iloc[pos])
+                txn_date = dates.iloc[pos].date()
+                invoice_number = ''
+                if invoices is not None and invoices.iloc[pos] is not None:
+                    invoice_number = invoices.iloc[pos]
+
+                key = (
+                    organization.id, supplier_id, category_id,
+                    amount, txn_date, invoice_number
+                )
+                if key in existing_keys:
+                    if self.skip_duplicates:
+                        self.stats['duplicates'] += 1
+                        continue
+                    self._record_error(index, "Duplicate transaction detected")
+                    continue
+                # Also catches duplicates within the file itself
+                existing_keys.add(key)
+
+                optional_data = {
+                    col: series.iloc[pos]
+                    for col, series in optional.items()
+                    if series.iloc[pos] is not None
+                }
+                objs.append(Transaction(
+                    organization=organization,
+                    uploaded_by=self.user,
+                    supplier_id=supplier_id,
+                    category_id=category_id,
+                    amount=amount,
+                    date=txn_date,
+                    upload_batch=self.batch_id,
+                    invoice_number=invoice_number,
+                    **optional_data
+                ))
+
+            # ignore_conflicts backstops the in-memory duplicate check:
+            # a transaction inserted by a concurrent upload between our
+            # prefetch and this INSERT is dropped by the unique
+            # constraint instead of aborting the whole batch.
+            Transaction.objects.bulk_create(objs, batch_size=1000, ignore_conflicts=True)
+
+        # Count what actually landed (upload_batch is indexed); anything
+        # the constraint swallowed is a duplicate we didn't see coming.
+        inserted = (
+            Transaction.objects.filter(upload_batch=self.batch_id).count()
+            - self.stats['successful']
         )
+        self.stats['duplicates'] += len(objs) - inserted
+        self.stats['successful'] += inserted
+
+        # bulk_create fires no post_save signals, so the analytics
+        # cache invalidation that normally rides them must run here --
+        # otherwise every cached analytics endpoint (and its ETag)
+        # keeps serving pre-upload data until the TTL expires.
+        if inserted:
+            for org_id in org_ids:
+                bump_analytics_cache_version(org_id)
+
+    def _record_error(self, index, message):
+        """Count a failed row; messages are sanitized at log-build time.
+
+        Only the first MAX_LOGGED_ERRORS messages are retained: the
+        stored error_log was always truncated to that preview anyway,
+        so a pathological file where every row fails no longer grows an
+        unbounded in-memory list before the cut.
+        """
+        self.stats['failed'] += 1
+        if len(self.errors) < MAX_LOGGED_ERRORS:
+            self.errors.append({
+                'row': index + 2,  # +2 for header and 0-indexing
+                'error': message,
+                # Don't store raw data for security
+            })
 
-        # Parse date
-        try:
-            date = pd.to_datetime(row['date']).date()
-        except Exception:
-            raise ValueError(f"Invalid date format: {row['date']}")
+    @staticmethod
+    def _clean_name(value):
+        """Sanitized supplier/category name, or '' when effectively empty."""
+        if pd.isna(value):
+            return ''
+        name = sanitize_csv_value(str(value).strip())
+        if not name or name == "'":
+            return ''
+        return name
+
+    @staticmethod
+    def _clean_optional(value):
+        """Sanitized optional value, or None when the cell is empty."""
+        if pd.isna(value):
+            return None
+        return sanitize_csv_value(str(value).strip())
+
+    def _resolve_row_organizations(self, df):
+        """Resolve the target organization for every row up front.
+
+        Returns a list aligned with df holding Organization instances,
+        or the error message string for rows naming an unknown one.
+        """
+        if not (self.allow_multi_org and 'organization' in df.columns):
+            return [self.default_organization] * len(df)
 
-        # Parse and validate amount
-        try:
-            amount_str = str(row['amount']).replace(',', '').replace('$', '').strip()
-            amount = Decimal(amount_str)
-            if amount < 0:
-                raise ValueError("Amount cannot be negative")
-            if amount > Decimal('999999999999.99'):
-                raise ValueError("Amount exceeds maximum allowed value")
-        except (InvalidOperation, ValueError) as e:
-            raise ValueError(f"Invalid amount value: {row['amount']}")
-
-        # Build optional fields with sanitization (exclude 'organization' - handled separately)
-        optional_data = {}
-        excluded_optional = {'invoice_number', 'organization'}
-        for col in self.OPTIONAL_COLUMNS:
-            if col in excluded_optional:
+        resolved = []
+        for index, raw in zip(df.index, df['organization']):
+            if pd.isna(raw):
+                resolved.append(self.default_organization)
                 continue
-            if col in row and pd.notna(row[col]):
-                # Sanitize all string values to prevent formula injection
-                value = str(row[col]).strip()
-                optional_data[col] = sanitize_csv_value(value)
+            try:
+                resolved.append(self._resolve_organization(str(raw), index))
+            except ValueError as e:
+                resolved.append(str(e))
+        return resolved
 
-        # Get invoice number for uniqueness check
-        invoice_number = ''
-        if 'invoice_number' in row and pd.notna(row['invoice_number']):
-            invoice_number = sanitize_csv_value(str(row['invoice_number']).strip())
+    def _bulk_resolve(self, model, pairs):
+        """Map (organization_id, name) pairs to primary keys.
 
-        # Use database constraint for duplicate detection (race-condition safe)
-        try:
-            Transaction.objects.create(
-                organization=organization,
-                uploaded_by=self.user,
-                supplier=supplier,
-                category=category,
-                amount=amount,
-                date=date,
-                upload_batch=self.batch_id,
-                invoice_number=invoice_number,
-                **optional_data
-            )
-        except IntegrityError:
-            # Duplicate detected by database constraint
-            if self.skip_duplicates:
-                self.stats['duplicates'] += 1
-                self.stats['successful'] -= 1  # Will be incremented in caller, so offset
-                return
-            raise ValueError("Duplicate transaction detected")
+        Missing rows are created in a single INSERT with
+        ignore_conflicts=True, so a concurrent upload creating the same
+        name is harmless -- the refetch picks up whichever row won.
+        """
+        if not pairs:
+            return {}
+        org_ids = {org_id for org_id, _ in pairs}
+        names = {name for _, name in pairs}
+
+        def fetch():
+            return {
+                (org_id, name): pk
+                for org_id, name, pk in model.objects.filter(
+                    organization_id__in=org_ids, name__in=names
+                ).values_list('organization_id', 'name', 'id')
+            }
+
+        resolved = fetch()
+        missing = [
+            model(organization_id=org_id, name=name, is_active=True)
+            for org_id, name in pairs if (org_id, name) not in resolved
+        ]
+        if missing:
+            model.objects.bulk_create(missing, ignore_conflicts=True)
+            resolved = fetch()
+        return resolved
 
 
 def get_duplicate_transactions(organization, days=30):
     """
-    Find potential duplicate transactions
+    Find potential duplicate transactions.
+
+    A window count per (supplier, category, amount, date) group returns
+    the duplicate rows themselves in one scan; the old GROUP BY variant
+    only yielded the group keys, leaving callers to re-query each group
+    for the actual transactions. Each row carries a dup_count annotation
+    with its group's size.
     """
-    from django.db.models import Count
+    from django.db.models import Count, F, Window
     from datetime import timedelta
 
     cutoff_date = timezone.now().date() - timedelta(days=days)
 
-    duplicates = Transaction.objects.filter(
+    return Transaction.objects.filter(
         organization=organization,
         date__gte=cutoff_date
-    ).values(
-        'supplier', 'category', 'amount', 'date'
     ).annotate(
-        count=Count('id')
-    ).filter(count__gt=1)
-
-    return duplicates
+        dup_count=Window(
+            expression=Count('id'),
+            partition_by=[F('supplier'), F('category'), F('amount'), F('date')]
+        )
+    ).filter(dup_count__gt=1)
 
 
 def bulk_delete_transactions(organization, transaction_ids):
     """
     Bulk delete transactions for an organization
     """
-    return Transaction.objects.filter(
+    # Dedupe before building the IN clause; clients retrying a delete
+    # commonly repeat ids, which would only bloat the SQL
+    queryset = Transaction.objects.filter(
         organization=organization,
-        id__in=transaction_ids
-    ).delete()
+        id__in=set(transaction_ids)
+    )
+    # The post_delete receiver would bump the analytics cache version
+    # once per doomed row; every row here belongs to the one
+    # organization, so suppress it and bump once.
+    with suppress_analytics_invalidation():
+        result = queryset.delete()
+    if result[0]:
+        bump_analytics_cache_version(organization.id)
+    return result
+
+
+# Export columns: (queryset field, CSV header, sanitize as string)
+_EXPORT_COLUMNS = [
+    ('supplier__name', 'Supplier', True),
+    ('category__name', 'Category', True),
+    ('amount', 'Amount', False),
+    ('date', 'Date', False),
+    ('description', 'Description', True),
+    ('subcategory', 'Subcategory', True),
+    ('location', 'Location', True),
+    ('fiscal_year', 'Fiscal Year', False),
+    ('spend_band', 'Spend Band', True),
+    ('payment_method', 'Payment Method', True),
+    ('invoice_number', 'Invoice Number', True),
+]
+
+
+class _Echo:
+    """File-like whose write() hands each CSV line back to the caller,
+    so csv.writer can drive a generator instead of filling a buffer."""
+
+    def write(self, value):
+        return value
 
 
-def export_transactions_to_csv(organization, filters=None):
+def iter_transactions_csv(organization, filters=None):
     """
-    Export transactions to CSV format with formula injection prevention
+    Yield CSV lines for the filtered transactions, with formula
+    injection prevention.
+
+    Rows go straight from the database cursor to the CSV writer via
+    queryset.iterator(), so memory stays flat no matter how large the
+    export is, and callers (e.g. a StreamingHttpResponse) can push the
+    first line to the client before the last row is read.
     """
     queryset = Transaction.objects.filter(organization=organization)
 
@@ -425,27 +696,25 @@ def export_transactions_to_csv(organization, filters=None):
         if 'category' in filters and filters['category']:
             queryset = queryset.filter(category_id=filters['category'])
 
-    # Convert to dataframe
-    data = queryset.values(
-        'supplier__name', 'category__name', 'amount', 'date',
-        'description', 'subcategory', 'location', 'fiscal_year',
-        'spend_band', 'payment_method', 'invoice_number'
-    )
+    fields = [field for field, _, _ in _EXPORT_COLUMNS]
+    sanitize_flags = [flag for _, _, flag in _EXPORT_COLUMNS]
 
-    df = pd.DataFrame(data)
+    writer = csv.writer(_Echo())
+    yield writer.writerow([header for _, header, _ in _EXPORT_COLUMNS])
 
-    # Rename columns
-    df.columns = [
-        'Supplier', 'Category', 'Amount', 'Date',
-        'Description', 'Subcategory', 'Location', 'Fiscal Year',
-        'Spend Band', 'Payment Method', 'Invoice Number'
-    ]
+    for row in queryset.values_list(*fields).iterator(chunk_size=2000):
+        yield writer.writerow([
+            sanitize_csv_value(str(value)) if flag and value is not None else value
+            for value, flag in zip(row, sanitize_flags)
+        ])
 
-    # Sanitize all string columns to prevent formula injection in exported CSV
-    string_columns = ['Supplier', 'Category', 'Description', 'Subcategory',
-                      'Location', 'Spend Band', 'Payment Method', 'Invoice Number']
-    for col in string_columns:
-        if col in df.columns:
-            df[col] = df[col].apply(lambda x: sanitize_csv_value(str(x)) if pd.notna(x) else '')
 
-    return df
+def export_transactions_to_csv(organization, out, filters=None):
+    """
+    Write the CSV export into the file-like `out`.
+    Returns the number of data rows written.
+    """
+    count = 0
+    for count, line in enumerate(iter_transactions_csv(organization, filters)):
+        out.write(line)
+    return count
@@ -0,0 +1,85 @@
+"""
+Celery tasks for procurement
+"""
+import logging
+from celery import shared_task
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def process_csv_upload(file_path, organization_id, user_id,
+                       skip_duplicates=True, allow_multi_org=False,
+                       upload_id=None):
+    """
+    Run a CSV import in the background.
+
+    The upload views save the file to storage and enqueue this task, so
+    the HTTP request returns immediately instead of blocking a worker
+    for the duration of a large import. Results are recorded on the
+    DataUpload row identified by upload_id (created by the processor
+    when not given); the stored file is removed once processing
+    finishes.
+    """
+    from django.contrib.auth.models import User
+    from django.core.files.storage import default_storage
+    from django.utils import timezone
+    from apps.authentication.models import Organization
+    from apps.authentication.utils import log_action
+    from .models import DataUpload
+    from .services import CSVProcessor
+
+    organization = Organization.objects.get(id=organization_id)
+    user = User.objects.select_related('profile__organization').get(id=user_id)
+    upload_row = DataUpload.objects.get(id=upload_id) if upload_id else None
+
+    try:
+        with default_storage.open(file_path) as file:
+            processor = CSVProcessor(
+                organization=organization,
+                user=user,
+                file=file,
+                skip_duplicates=skip_duplicates,
+                allow_multi_org=allow_multi_org,
+                upload=upload_row,
+            )
+            upload = processor.process()
+    except ValueError as e:
+        # process() has already marked the DataUpload row failed
+        logger.warning(f"CSV upload task failed for {file_path}: {e}")
+        return None
+    except Exception:
+        # Anything process() didn't anticipate -- e.g. the stored file
+        # missing from the worker's filesystem. Mark the upload failed
+        # so it doesn't sit in 'processing' forever, then re-raise for
+        # Celery's own error handling.
+        logger.exception(f"CSV upload task crashed for {file_path}")
+        if upload_row is not None:
+            upload_row.status = 'failed'
+            upload_row.error_log = [
+                {'error': 'Upload processing failed due to an internal error.'}
+            ]
+            upload_row.completed_at = timezone.now()
+            upload_row.save()
+        raise
+    finally:
+        default_storage.delete(file_path)
+
+    audit_details = {
+        'file_name': upload.file_name,
+        'successful': upload.successful_rows,
+        'failed': upload.failed_rows,
+        'duplicate': upload.duplicate_rows,
+    }
+    if allow_multi_org and processor.orgs_affected:
+        audit_details['organizations_affected'] = list(processor.orgs_affected)
+
+    log_action(
+        user=user,
+        action='upload',
+        resource='transactions',
+        resource_id=upload.batch_id,
+        details=audit_details,
+    )
+
+    return upload.id
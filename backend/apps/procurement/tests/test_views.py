@@ -108,6 +108,22 @@ class TestSupplierViewSet:
         assert len(results) == 1
         assert results[0]['name'] == 'Acme Corporation'
 
+    def test_pagination_count_with_transactions(self, authenticated_client, organization, supplier, category, admin_user):
+        """Test that the page count reflects suppliers, not joined rows."""
+        for i in range(3):
+            TransactionFactory(
+                organization=organization,
+                supplier=supplier,
+                category=category,
+                uploaded_by=admin_user,
+                invoice_number=f'COUNT-{i}'
+            )
+
+        url = reverse('supplier-list')
+        response = authenticated_client.get(url, {'search': supplier.name})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['count'] == 1
+
 
 @pytest.mark.django_db
 class TestCategoryViewSet:
@@ -191,6 +207,33 @@ class TestTransactionViewSet:
         assert Supplier.objects.filter(name='New Supplier via Name').exists()
         assert Category.objects.filter(name='New Category via Name').exists()
 
+    def test_create_transactions_in_bulk(self, admin_client, organization, supplier, category):
+        """Test creating several transactions with one list request."""
+        url = reverse('transaction-list')
+        data = [
+            {
+                'supplier': supplier.id,
+                'category': category.id,
+                'amount': '100.00',
+                'date': '2024-03-01',
+                'invoice_number': 'BULK-API-1'
+            },
+            {
+                'supplier_name': 'Bulk Supplier via Name',
+                'category_name': 'Bulk Category via Name',
+                'amount': '200.00',
+                'date': '2024-03-02',
+                'invoice_number': 'BULK-API-2'
+            },
+        ]
+        response = admin_client.post(url, data, format='json')
+        assert response.status_code == status.HTTP_201_CREATED
+        assert Transaction.objects.filter(
+            invoice_number__in=['BULK-API-1', 'BULK-API-2']
+        ).count() == 2
+        assert Supplier.objects.filter(name='Bulk Supplier via Name').exists()
+        assert Category.objects.filter(name='Bulk Category via Name').exists()
+
     def test_transaction_organization_scoped(self, authenticated_client, other_organization, other_org_user):
         """Test that transactions from other orgs are not visible."""
         other_supplier = SupplierFactory(organization=other_organization)
@@ -248,9 +291,12 @@ Test Supplier,Test Category,2000.00,2024-01-16,Test transaction 2"""
 
         url = reverse('transaction-upload-csv')
         response = manager_client.post(url, {'file': csv_file}, format='multipart')
-        assert response.status_code == status.HTTP_201_CREATED
-        assert response.data['status'] in ['completed', 'partial']
-        assert response.data['successful_rows'] >= 1
+        assert response.status_code == status.HTTP_202_ACCEPTED
+
+        # Celery runs eagerly in tests, so processing has completed
+        upload = DataUpload.objects.get(id=response.data['id'])
+        assert upload.status in ['completed', 'partial']
+        assert upload.successful_rows >= 1
 
     def test_upload_csv_viewer_forbidden(self, authenticated_client):
         """Test that viewers cannot upload CSV files."""
@@ -274,6 +320,30 @@ Test,Test,100.00,2024-01-01"""
         response = manager_client.post(url, {'file': pdf_file}, format='multipart')
         assert response.status_code == status.HTTP_400_BAD_REQUEST
 
+    def test_upload_task_crash_marks_upload_failed(self, organization, manager_user):
+        """A worker-side crash (e.g. the stored file missing from the
+        worker's filesystem) must mark the upload failed instead of
+        leaving the row in 'processing' forever."""
+        from apps.procurement.tasks import process_csv_upload
+
+        upload = DataUploadFactory(
+            organization=organization,
+            uploaded_by=manager_user,
+            status='processing',
+        )
+
+        with pytest.raises(FileNotFoundError):
+            process_csv_upload(
+                file_path='csv_uploads/does-not-exist.csv',
+                organization_id=organization.id,
+                user_id=manager_user.id,
+                upload_id=upload.id,
+            )
+
+        upload.refresh_from_db()
+        assert upload.status == 'failed'
+        assert upload.error_log
+
     def test_upload_csv_creates_audit_log(self, manager_client, manager_user):
         """Test that CSV upload creates an audit log."""
         csv_content = """supplier,category,amount,date
@@ -283,7 +353,7 @@ Test Supplier,Test Category,500.00,2024-03-01"""
 
         url = reverse('transaction-upload-csv')
         response = manager_client.post(url, {'file': csv_file}, format='multipart')
-        assert response.status_code == status.HTTP_201_CREATED
+        assert response.status_code == status.HTTP_202_ACCEPTED
 
         log = AuditLog.objects.filter(
             user=manager_user,
@@ -399,6 +469,12 @@ class TestExport:
         })
         assert response.status_code == status.HTTP_200_OK
 
+    def test_export_invalid_date_rejected(self, authenticated_client, transaction):
+        """Test that a malformed date filter returns a field error."""
+        url = reverse('transaction-export')
+        response = authenticated_client.get(url, {'start_date': 'not-a-date'})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
     def test_export_creates_audit_log(self, authenticated_client, user, transaction):
         """Test that export creates an audit log."""
         url = reverse('transaction-export')
@@ -508,3 +584,55 @@ class TestOrganizationIsolation:
         assert response.data['count'] == 1
         assert not Transaction.objects.filter(id=own_tx.id).exists()
         assert Transaction.objects.filter(id=other_tx.id).exists()
+
+
+class TestTokenBucketThrottle:
+    """Tests for the token-bucket rate limiting."""
+
+    def _make_throttle(self, rate, now=1000.0):
+        from apps.procurement.views import TokenBucketThrottle
+
+        class _Throttle(TokenBucketThrottle):
+            scope = 'bucket_test'
+            THROTTLE_RATES = {'bucket_test': rate}
+
+        throttle = _Throttle()
+        throttle.cache.delete('throttle_bucket_test_1.2.3.4')
+        throttle.timer = lambda: self.now
+        self.now = now
+        return throttle
+
+    def _make_request(self, rf):
+        request = rf.get('/', REMOTE_ADDR='1.2.3.4')
+        request.user = None
+        return request
+
+    def test_allows_until_bucket_empty(self, rf):
+        throttle = self._make_throttle('2/min')
+        request = self._make_request(rf)
+
+        assert throttle.allow_request(request, None)
+        assert throttle.allow_request(request, None)
+        assert not throttle.allow_request(request, None)
+        assert throttle.wait() > 0
+
+    def test_bucket_refills_over_time(self, rf):
+        throttle = self._make_throttle('2/min')
+        request = self._make_request(rf)
+
+        assert throttle.allow_request(request, None)
+        assert throttle.allow_request(request, None)
+        assert not throttle.allow_request(request, None)
+
+        # Half the window passes: one token has refilled
+        self.now += 30
+        assert throttle.allow_request(request, None)
+        assert not throttle.allow_request(request, None)
+
+    def test_unconfigured_scope_allows(self, rf):
+        throttle = self._make_throttle('2/min')
+        throttle.THROTTLE_RATES = {}
+        request = self._make_request(rf)
+
+        for _ in range(5):
+            assert throttle.allow_request(request, None)
@@ -5,45 +5,150 @@ Views for procurement data management with security features:
 - Object-level permission checks
 - Audit logging for all operations
 """
+import secrets
+
+from django.core.paginator import Paginator
+from django.utils.functional import cached_property
 from rest_framework import viewsets, status
+from rest_framework.pagination import PageNumberPagination
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from rest_framework.throttling import ScopedRateThrottle
+from rest_framework.throttling import SimpleRateThrottle
 from rest_framework.exceptions import PermissionDenied
-from django.http import HttpResponse
-from django.db.models import Count, Sum, Q
+from django.core.files.storage import default_storage
+from django.http import StreamingHttpResponse
 from apps.authentication.permissions import CanUploadData, CanDeleteData
 from apps.authentication.utils import log_action
 from .models import Supplier, Category, Transaction, DataUpload
 from .serializers import (
     SupplierSerializer, CategorySerializer, TransactionSerializer,
     TransactionCreateSerializer, TransactionBulkDeleteSerializer,
-    DataUploadSerializer, CSVUploadSerializer
+    DataUploadSerializer, CSVUploadSerializer, ExportFilterSerializer
 )
-from .services import CSVProcessor, bulk_delete_transactions, export_transactions_to_csv
+from .services import bulk_delete_transactions, iter_transactions_csv
+from .tasks import process_csv_upload
+
+
+class TokenBucketThrottle(SimpleRateThrottle):
+    """Cache-backed token-bucket rate limiting.
+
+    SimpleRateThrottle keeps a timestamp list per key and deserializes,
+    scans and rewrites it on every request -- O(limit) work that adds
+    up on the high-traffic read endpoints. A token bucket stores two
+    numbers (tokens remaining, last refill time) and does constant-time
+    arithmetic per request, while staying in the shared cache so the
+    limit holds across workers.
+
+    Subclasses set `scope`, keyed to DEFAULT_THROTTLE_RATES. These
+    throttles previously extended ScopedRateThrottle, which only
+    activates when the *view* declares `throttle_scope` -- none do, so
+    the documented per-operation limits were never enforced. Resolving
+    the scope from the throttle class itself makes them effective.
+    An unconfigured scope (e.g. the test settings clear the rates)
+    disables the throttle, matching DRF's behaviour for a None rate.
+    """
+
+    def __init__(self):
+        # Rate resolution is deferred to allow_request so a missing
+        # scope configuration disables throttling instead of raising
+        # at instantiation.
+        pass
+
+    def get_cache_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            ident = request.user.pk
+        else:
+            ident = self.get_ident(request)
+        return self.cache_format % {'scope': self.scope, 'ident': ident}
+
+    def allow_request(self, request, view):
+        self.rate = self.THROTTLE_RATES.get(self.scope)
+        if self.rate is None:
+            return True
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        now = self.timer()
+        self._refill_rate = self.num_requests / self.duration
+        tokens, last = self.cache.get(self.key, (self.num_requests, now))
+        tokens = min(
+            self.num_requests,
+            tokens + (now - last) * self._refill_rate
+        )
+        if tokens < 1:
+            self._tokens = tokens
+            return False
+        self.cache.set(self.key, (tokens - 1, now), self.duration)
+        return True
 
+    def wait(self):
+        """Seconds until the bucket refills to a whole token."""
+        return (1 - self._tokens) / self._refill_rate
 
-class UploadThrottle(ScopedRateThrottle):
+
+class UploadThrottle(TokenBucketThrottle):
     """Rate limiting for file upload operations (10/hour per user)"""
     scope = 'uploads'
 
 
-class ExportThrottle(ScopedRateThrottle):
+class ExportThrottle(TokenBucketThrottle):
     """Rate limiting for export operations (30/hour per user)"""
     scope = 'exports'
 
 
-class BulkDeleteThrottle(ScopedRateThrottle):
+class BulkDeleteThrottle(TokenBucketThrottle):
     """Rate limiting for bulk delete operations (10/hour per user)"""
     scope = 'bulk_delete'
 
 
-class ReadAPIThrottle(ScopedRateThrottle):
+class ReadAPIThrottle(TokenBucketThrottle):
     """Rate limiting for read API operations (500/hour per user)"""
     scope = 'read_api'
 
 
+class _BaseCountPaginator(Paginator):
+    """Paginator that can count a simpler queryset than it pages."""
+
+    def __init__(self, object_list, per_page, count_queryset=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self._count_queryset = count_queryset
+
+    @cached_property
+    def count(self):
+        queryset = self._count_queryset
+        if queryset is None:
+            queryset = self.object_list
+        return queryset.count()
+
+
+class FastCountPagination(PageNumberPagination):
+    """Page counting against the un-annotated base queryset.
+
+    The aggregate annotations on the supplier/category lists make the
+    default COUNT(*) wrap the whole join + GROUP BY in a subquery, even
+    though the annotations can't change the row count. Views that
+    annotate set `count_queryset` to the plain organization-filtered
+    queryset; the filter backends are re-applied to it (search and
+    field filters must still shape the count) and the result is a
+    single indexed WHERE scan with no join.
+    """
+
+    def paginate_queryset(self, queryset, request, view=None):
+        count_queryset = getattr(view, 'count_queryset', None)
+        if count_queryset is not None:
+            count_queryset = view.filter_queryset(count_queryset)
+        self._count_queryset = count_queryset
+        return super().paginate_queryset(queryset, request, view)
+
+    def django_paginator_class(self, queryset, per_page):
+        return _BaseCountPaginator(
+            queryset, per_page, count_queryset=self._count_queryset
+        )
+
+
 def check_object_organization(obj, user):
     """
     Verify that an object belongs to the user's organization.
@@ -54,9 +159,13 @@ def check_object_organization(obj, user):
     if user.is_superuser:
         return
 
-    if not hasattr(user, 'profile'):
+    profile = getattr(user, 'profile', None)
+    if profile is None:
         raise PermissionDenied("User profile not found")
-    if obj.organization != user.profile.organization:
+    # Compare the FK ids: both are locally loaded columns, where
+    # comparing the Organization objects dereferences two lazy
+    # descriptors and can cost a SELECT each
+    if obj.organization_id != profile.organization_id:
         raise PermissionDenied("Cannot access data from another organization")
 
 
@@ -67,26 +176,31 @@ class SupplierViewSet(viewsets.ModelViewSet):
     serializer_class = SupplierSerializer
     permission_classes = [IsAuthenticated]
     throttle_classes = [ReadAPIThrottle]
+    pagination_class = FastCountPagination
     filterset_fields = ['is_active']
     search_fields = ['name', 'code']
     ordering_fields = ['name', 'created_at']
+    # Explicit default: Meta.ordering is ignored on grouped (annotated)
+    # queries, which would leave pagination order undefined. Backed by
+    # the (organization, name) index.
+    ordering = ['name']
 
     def get_queryset(self):
         # Only show suppliers from user's organization
-        if not hasattr(self.request.user, 'profile'):
+        profile = getattr(self.request.user, 'profile', None)
+        if profile is None:
             return Supplier.objects.none()
 
         queryset = Supplier.objects.filter(
-            organization=self.request.user.profile.organization
+            organization_id=profile.organization_id
         )
 
-        # Annotate with transaction count and total spend
-        queryset = queryset.annotate(
-            transaction_count=Count('transactions'),
-            total_spend=Sum('transactions__amount')
-        )
+        # The paginator counts the plain filtered rows, not the
+        # annotated query
+        self.count_queryset = queryset
 
-        return queryset
+        # Serializer declares the aggregates its fields need
+        return SupplierSerializer.setup_eager_loading(queryset)
 
     def perform_create(self, serializer):
         serializer.save(organization=self.request.user.profile.organization)
@@ -130,26 +244,30 @@ class CategoryViewSet(viewsets.ModelViewSet):
     serializer_class = CategorySerializer
     permission_classes = [IsAuthenticated]
     throttle_classes = [ReadAPIThrottle]
+    pagination_class = FastCountPagination
     filterset_fields = ['is_active', 'parent']
     search_fields = ['name', 'description']
     ordering_fields = ['name', 'created_at']
+    # Same rationale as SupplierViewSet: grouped queries drop
+    # Meta.ordering
+    ordering = ['name']
 
     def get_queryset(self):
         # Only show categories from user's organization
-        if not hasattr(self.request.user, 'profile'):
+        profile = getattr(self.request.user, 'profile', None)
+        if profile is None:
             return Category.objects.none()
 
         queryset = Category.objects.filter(
-            organization=self.request.user.profile.organization
+            organization_id=profile.organization_id
         )
 
-        # Annotate with transaction count and total spend
-        queryset = queryset.annotate(
-            transaction_count=Count('transactions'),
-            total_spend=Sum('transactions__amount')
-        )
+        # The paginator counts the plain filtered rows, not the
+        # annotated query
+        self.count_queryset = queryset
 
-        return queryset
+        # Serializer declares the parent join and aggregates it needs
+        return CategorySerializer.setup_eager_loading(queryset)
 
     def perform_create(self, serializer):
         serializer.save(organization=self.request.user.profile.organization)
@@ -195,32 +313,54 @@ class TransactionViewSet(viewsets.ModelViewSet):
     filterset_fields = ['supplier', 'category', 'fiscal_year', 'date']
     search_fields = ['description', 'invoice_number']
     ordering_fields = ['date', 'amount', 'created_at']
+    # Matches Meta.ordering; explicit so pagination order never depends
+    # on how the queryset was built. Backed by (organization, -date).
+    ordering = ['-date', '-created_at']
 
     def get_serializer_class(self):
         if self.action == 'create':
             return TransactionCreateSerializer
         return TransactionSerializer
 
+    def get_serializer(self, *args, **kwargs):
+        # Accept a JSON array on create: the list serializer batches
+        # the supplier/category upserts and inserts instead of running
+        # the single-object path once per item
+        if self.action == 'create' and isinstance(kwargs.get('data'), list):
+            kwargs['many'] = True
+        return super().get_serializer(*args, **kwargs)
+
     def get_queryset(self):
         # Only show transactions from user's organization
-        if not hasattr(self.request.user, 'profile'):
+        profile = getattr(self.request.user, 'profile', None)
+        if profile is None:
             return Transaction.objects.none()
 
         queryset = Transaction.objects.filter(
-            organization=self.request.user.profile.organization
-        ).select_related('supplier', 'category', 'uploaded_by')
+            organization_id=profile.organization_id
+        )
 
-        return queryset
+        # Serializer declares the FK joins its name fields need
+        return TransactionSerializer.setup_eager_loading(queryset)
 
     def perform_create(self, serializer):
         serializer.save()
-        log_action(
-            user=self.request.user,
-            action='create',
-            resource='transaction',
-            resource_id=str(serializer.instance.id),
-            request=self.request
-        )
+        if isinstance(serializer.instance, list):
+            log_action(
+                user=self.request.user,
+                action='create',
+                resource='transactions',
+                details={'count': len(serializer.instance)},
+                request=self.request
+            )
+        else:
+            log_action(
+                user=self.request.user,
+                action='create',
+                resource='transaction',
+                resource_id=str(serializer.instance.id),
+                request=self.request
+            )
 
     def perform_update(self, serializer):
         # Verify object belongs to user's organization
@@ -252,6 +392,10 @@ class TransactionViewSet(viewsets.ModelViewSet):
         Upload CSV file with procurement data.
         Rate limited to 10 uploads per hour per user.
 
+        The file is validated, saved and queued for background
+        processing; the response is 202 with the DataUpload row, which
+        the client polls (via /uploads/) for progress and results.
+
         Super admins (Django superusers) can upload data for multiple organizations
         by including an 'organization' column in the CSV. Regular users' uploads
         will have any 'organization' column ignored.
@@ -261,48 +405,37 @@ class TransactionViewSet(viewsets.ModelViewSet):
 
         # Check if user is a super admin (can upload for multiple orgs)
         is_super_admin = request.user.is_superuser
+        organization = request.user.profile.organization
+        file = serializer.validated_data['file']
+
+        # Create the upload row before queueing so the client has an id
+        # to poll; the Celery task records results on it and writes the
+        # audit log. A large import no longer ties up this request.
+        upload = DataUpload.objects.create(
+            organization=organization,
+            uploaded_by=request.user,
+            file_name=file.name,
+            file_size=file.size,
+            batch_id=secrets.token_urlsafe(32),
+            status='processing'
+        )
+        file_path = default_storage.save(f'csv_uploads/{file.name}', file)
+        process_csv_upload.delay(
+            file_path=file_path,
+            organization_id=organization.id,
+            user_id=request.user.id,
+            skip_duplicates=serializer.validated_data['skip_duplicates'],
+            allow_multi_org=is_super_admin,
+            upload_id=upload.id,
+        )
 
-        try:
-            processor = CSVProcessor(
-                organization=request.user.profile.organization,
-                user=request.user,
-                file=serializer.validated_data['file'],
-                skip_duplicates=serializer.validated_data['skip_duplicates'],
-                allow_multi_org=is_super_admin
-            )
-
-            upload = processor.process()
-
-            # Build audit details
-            audit_details = {
-                'file_name': upload.file_name,
-                'successful': upload.successful_rows,
-                'failed': upload.failed_rows
-            }
-
-            # Include affected organizations for super admin multi-org uploads
-            if is_super_admin and len(processor.orgs_affected) > 0:
-                audit_details['organizations_affected'] = list(processor.orgs_affected)
-
-            log_action(
-                user=request.user,
-                action='upload',
-                resource='transactions',
-                resource_id=upload.batch_id,
-                details=audit_details,
-                request=request
-            )
-
-            return Response(
-                DataUploadSerializer(upload).data,
-                status=status.HTTP_201_CREATED
-            )
-
-        except Exception as e:
-            return Response(
-                {'error': str(e)},
-                status=status.HTTP_400_BAD_REQUEST
-            )
+        # With an eager task backend (tests, dev without a broker) the
+        # import has already finished; pick up whatever state exists
+        upload.refresh_from_db()
+        return Response(
+            DataUploadSerializer(upload).data,
+            status=status.HTTP_202_ACCEPTED
+        )
     
     @action(detail=False, methods=['post'], permission_classes=[CanDeleteData], throttle_classes=[BulkDeleteThrottle])
     def bulk_delete(self, request):
@@ -337,31 +470,31 @@ class TransactionViewSet(viewsets.ModelViewSet):
         Export transactions to CSV.
         Rate limited to 30 exports per hour per user.
         """
-        filters = {
-            'start_date': request.query_params.get('start_date'),
-            'end_date': request.query_params.get('end_date'),
-            'supplier': request.query_params.get('supplier'),
-            'category': request.query_params.get('category'),
-        }
-        
-        # Remove None values
-        filters = {k: v for k, v in filters.items() if v}
-        
-        df = export_transactions_to_csv(
-            organization=request.user.profile.organization,
-            filters=filters
+        # Typed validation: malformed dates/ids become a 400 here
+        # instead of an ORM error mid-export
+        filter_serializer = ExportFilterSerializer(data=request.query_params)
+        filter_serializer.is_valid(raise_exception=True)
+        filters = filter_serializer.validated_data
+
+
+        # Rows stream from the database cursor straight down the
+        # socket: first byte leaves before the last row is read, and
+        # memory stays flat regardless of export size
+        response = StreamingHttpResponse(
+            iter_transactions_csv(
+                organization=request.user.profile.organization,
+                filters=filters
+            ),
+            content_type='text/csv'
         )
-        
-        # Convert to CSV
-        response = HttpResponse(content_type='text/csv')
         response['Content-Disposition'] = 'attachment; filename="transactions.csv"'
-        df.to_csv(response, index=False)
-        
+
+        # The body streams after this returns, so the row count isn't
+        # known yet; the export action itself is what gets audited
         log_action(
             user=request.user,
             action='export',
             resource='transactions',
-            details={'count': len(df)},
             request=request
         )
         
@@ -376,12 +509,15 @@ class DataUploadViewSet(viewsets.ReadOnlyModelViewSet):
     permission_classes = [IsAuthenticated]
     throttle_classes = [ReadAPIThrottle]
     ordering_fields = ['created_at']
+    # Newest uploads first, backed by (organization, -created_at)
+    ordering = ['-created_at']
 
     def get_queryset(self):
         # Only show uploads from user's organization
-        if not hasattr(self.request.user, 'profile'):
+        profile = getattr(self.request.user, 'profile', None)
+        if profile is None:
             return DataUpload.objects.none()
 
         return DataUpload.objects.filter(
-            organization=self.request.user.profile.organization
+            organization_id=profile.organization_id
         )
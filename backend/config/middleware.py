@@ -3,6 +3,32 @@ Custom middleware for security and API versioning.
 """
 
 
+class AuditLogBufferMiddleware:
+    """
+    Middleware that batches audit log writes per request.
+
+    While a request is being handled, log_action() appends entries to a
+    request-scoped buffer instead of issuing one INSERT per call. The
+    buffer is flushed with a single bulk_create once the view has
+    produced its response, amortizing the write overhead for endpoints
+    that log multiple actions.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        # Imported here so the app registry is ready before model imports
+        from apps.authentication.utils import start_audit_buffer, flush_audit_buffer
+
+        start_audit_buffer()
+        try:
+            response = self.get_response(request)
+        finally:
+            flush_audit_buffer()
+        return response
+
+
 class DeprecationMiddleware:
     """
     Middleware to add deprecation headers to legacy API endpoints.
@@ -0,0 +1,52 @@
+"""
+Custom DRF renderers.
+"""
+import logging
+from decimal import Decimal
+
+from rest_framework.renderers import JSONRenderer
+
+# Try to import orjson for fast JSON serialization
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+    logging.warning("orjson not installed. JSON rendering will use the standard library.")
+
+logger = logging.getLogger(__name__)
+
+
+def _orjson_default(obj):
+    """Serialize types orjson does not handle natively."""
+    if isinstance(obj, Decimal):
+        return float(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    JSON renderer backed by orjson.
+
+    orjson serializes datetimes, dates and UUIDs natively and is several
+    times faster than the standard library encoder on the large list
+    payloads the analytics endpoints return. Decimals are rendered as
+    floats, matching the service layer's existing float() conversions.
+
+    Falls back to DRF's default renderer when orjson is unavailable, when
+    pretty-printing is requested (browsable API) or when a payload
+    contains types orjson cannot handle.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        if not HAS_ORJSON or self.get_indent(accepted_media_type or '', renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            return orjson.dumps(data, default=_orjson_default)
+        except TypeError:
+            # Payload contains a type orjson can't encode (e.g. lazy strings)
+            return super().render(data, accepted_media_type, renderer_context)
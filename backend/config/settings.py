@@ -77,6 +77,7 @@ MIDDLEWARE = [
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'config.middleware.DeprecationMiddleware',  # Adds deprecation headers to legacy endpoints
+    'config.middleware.AuditLogBufferMiddleware',  # Batches audit log writes per request
 ]
 
 ROOT_URLCONF = 'config.urls'
@@ -127,6 +128,16 @@ PASSWORD_HASHERS = [
     'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
 ]
 
+# Development-only fast hashing. Argon2 dominates login and
+# change-password latency by design (hundreds of ms per hash), which is
+# the right trade-off in production but slows local iteration. Opting in
+# via FAST_PASSWORD_HASHING prepends a cheap hasher for new hashes while
+# the strong hashers remain available to verify existing ones; the flag
+# is ignored unless DEBUG is on. The test settings already pin
+# MD5PasswordHasher separately.
+if DEBUG and config('FAST_PASSWORD_HASHING', default=False, cast=bool):
+    PASSWORD_HASHERS.insert(0, 'django.contrib.auth.hashers.MD5PasswordHasher')
+
 # Internationalization
 LANGUAGE_CODE = 'en-us'
 TIME_ZONE = 'America/New_York'  # EST/EDT
@@ -169,7 +180,7 @@ REST_FRAMEWORK = {
     'PAGE_SIZE': 100,
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
     'DEFAULT_RENDERER_CLASSES': (
-        'rest_framework.renderers.JSONRenderer',
+        'config.renderers.ORJSONRenderer',
     ),
     'DEFAULT_THROTTLE_CLASSES': [
         'rest_framework.throttling.AnonRateThrottle',
@@ -289,6 +300,20 @@ DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL', default='noreply@analytics.com
 CELERY_BROKER_URL = config('CELERY_BROKER_URL', default='redis://localhost:6379/0')
 CELERY_RESULT_BACKEND = config('CELERY_RESULT_BACKEND', default='redis://localhost:6379/0')
 
+# Run the dashboard bundle's independent aggregations on concurrent
+# database connections. Requires a real connection-per-thread capable
+# database (PostgreSQL); keep disabled for SQLite.
+ANALYTICS_PARALLEL_QUERIES = config('ANALYTICS_PARALLEL_QUERIES', default=False, cast=bool)
+
+# Periodic tasks (Celery beat)
+CELERY_BEAT_SCHEDULE = {
+    # Precompute dashboard analytics hourly so requests hit a warm cache
+    'refresh-analytics-cache': {
+        'task': 'apps.analytics.tasks.refresh_analytics_cache',
+        'schedule': 3600,
+    },
+}
+
 # API Documentation
 SPECTACULAR_SETTINGS = {
     'TITLE': 'Analytics Dashboard API',